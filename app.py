@@ -1,31 +1,38 @@
 import logging
 import time
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, Response, request
 from flask_cors import CORS
 from config import Config
-from services.api_football_client import APIFootballClient
-from services.league_service import LeagueService
-from middleware.rate_limiter import setup_rate_limiter, LIVE_DATA_LIMIT, STATIC_DATA_LIMIT
-from utils.error_handlers import register_error_handlers, APIError
 from utils.logging_config import setup_logging, get_logger, log_request
 from utils.env_logging import setup_environment_logging, configure_environment_loggers
-from middleware.request_logger import setup_request_logging, log_api_endpoint
 
-# Setup environment-specific logging
+# Setup environment-specific logging before importing modules that log at
+# import time (the cache manager connects to Redis as it is created)
 setup_environment_logging()
 configure_environment_loggers()
 logger = get_logger('app')
 
+from services.api_football_client import APIFootballClient
+from services.league_service import LeagueService
+from models.league_models import Coverage
+from middleware.rate_limiter import setup_rate_limiter, LIVE_DATA_LIMIT, STATIC_DATA_LIMIT
+from middleware.cache import cache_manager, inflight_requests
+from utils.error_handlers import register_error_handlers, APIError
+from middleware.request_logger import setup_request_logging, log_api_endpoint
+
 # Validate configuration
 try:
     Config.validate()
 except ValueError as e:
-    logger.error(f"Configuration error: {e}")
+    logger.error("Configuration error: %s", e)
     exit(1)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
+app.json.sort_keys = False
+app.json.compact = True  # Error responses still go through jsonify
 
 # Setup CORS
 CORS(app, origins=['*'])  # Configure appropriately for production
@@ -42,59 +49,146 @@ setup_request_logging(app)
 # Initialize API client
 api_client = APIFootballClient()
 
+# Bound once so hot paths skip the module attribute lookup
+_dumps = orjson.dumps
+
+# Default upstream filters for league endpoints; shared across requests, never mutate
+DEFAULT_LEAGUE_PARAMS = {
+    'type': 'league',
+    'current': 'true'
+}
+
+def _json_default(obj):
+    """Serialize model types orjson does not handle natively"""
+    if isinstance(obj, Coverage):
+        return obj.to_dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def json_response(data) -> Response:
+    """Serialize data with orjson and wrap it in a JSON response"""
+    return Response(_dumps(data, default=_json_default), mimetype='application/json')
+
+def raw_json_response(payload: bytes) -> Response:
+    """Wrap already-serialized JSON bytes in a response without re-encoding"""
+    return Response(payload, mimetype='application/json')
+
+def _fetch_and_cache(cache_key: str, endpoint_name: str, api_method, params: dict, ttl: int) -> tuple:
+    """Fetch from API, cache the serialized result and return (result, payload)"""
+    logger.info("Cache miss for %s, executing function", endpoint_name)
+    result = api_method(**params)
+    payload = _dumps(result)
+    
+    # Cache the raw data
+    if result:
+        cache_manager.set_raw(cache_key, payload, ttl)
+        logger.info("Cached result for %s with TTL %ss", endpoint_name, ttl)
+    
+    return result, payload
+
 def get_cached_or_fetch(endpoint_name: str, api_method, params: dict, ttl: int):
     """Helper function to get data from cache or fetch from API"""
-    from middleware.cache import cache_manager
-    
     # Check cache first
     cache_key = cache_manager._generate_cache_key(endpoint_name, params)
-    cached_data = cache_manager.get(cache_key)
+    cached_data = cache_manager.get(cache_key, ttl)
     
     if cached_data is not None:
-        logger.info(f"Cache hit for {endpoint_name}")
+        logger.info("Cache hit for %s", endpoint_name)
         return cached_data
     
-    # Cache miss - fetch from API
-    logger.info(f"Cache miss for {endpoint_name}, executing function")
-    result = api_method(**params)
+    # Cache miss - concurrent misses for the same key share one upstream call
+    result, _ = inflight_requests.run(
+        cache_key, lambda: _fetch_and_cache(cache_key, endpoint_name, api_method, params, ttl)
+    )
+    return result
+
+def _get_raw_or_fetch(cache_key: str, endpoint_name: str, api_method, get_params, ttl: int) -> bytes:
+    """Return cached JSON bytes for cache_key, fetching with get_params() on a miss"""
+    # Check cache first - hits are returned as stored, never decoded
+    cached_payload = cache_manager.get_raw(cache_key, ttl)
     
-    # Cache the raw data
-    if result:
-        cache_manager.set(cache_key, result, ttl)
-        logger.info(f"Cached result for {endpoint_name} with TTL {ttl}s")
+    if cached_payload is not None:
+        logger.info("Cache hit for %s", endpoint_name)
+        return cached_payload
     
-    return result
+    # Cache miss - concurrent misses for the same key share one upstream call
+    _, payload = inflight_requests.run(
+        cache_key, lambda: _fetch_and_cache(cache_key, endpoint_name, api_method, get_params(), ttl)
+    )
+    return payload
 
-# Add CORS and rate limiting headers
+def get_cached_raw_or_fetch(endpoint_name: str, api_method, params: dict, ttl: int) -> bytes:
+    """Like get_cached_or_fetch, but returns serialized JSON bytes for pass-through endpoints"""
+    cache_key = cache_manager._generate_cache_key(endpoint_name, params)
+    return _get_raw_or_fetch(cache_key, endpoint_name, api_method, lambda: params, ttl)
+
+def get_cached_query_or_fetch(endpoint_name: str, api_method, ttl: int) -> bytes:
+    """Pass-through variant keyed on the raw query string; params are only built on a miss"""
+    cache_key = cache_manager.key_for(endpoint_name, request.query_string)
+    return _get_raw_or_fetch(cache_key, endpoint_name, api_method, request.args.to_dict, ttl)
+
+# Identical on every response, so built once
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
+}
+
+# Add CORS and upstream rate limiting headers
+# (Flask-Limiter already emits X-RateLimit-* itself via headers_enabled)
 @app.after_request
 def add_headers(response):
-    # Add rate limit headers
-    if hasattr(app, 'limiter'):
-        rate_limit_headers = limiter.get_window_stats(request)
-        if rate_limit_headers:
-            response.headers.update(rate_limit_headers)
+    # Forward API Football's remaining quota so clients can back off early
+    if api_client.upstream_limiter.remaining is not None:
+        response.headers['X-Upstream-RateLimit-Remaining'] = api_client.upstream_limiter.remaining
+    
+    response.headers.update(CORS_HEADERS)
     
-    # Add CORS headers
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    # flask_cors answers preflights with an empty body; don't label it text/html
+    if request.method == 'OPTIONS' and not response.content_length:
+        response.headers.remove('Content-Type')
     
     return response
 
+# Constant response bodies, serialized once at import time
+HEALTH_BODY_HEAD = b'{"status":"healthy","timestamp":'
+HEALTH_BODY_TAIL = b',' + orjson.dumps({
+    'version': '1.0.0',
+    'services': {
+        'api_football': 'connected',
+        'cache': 'available' if api_client else 'unavailable'
+    }
+})[1:]
+
+ROOT_BODY = orjson.dumps({
+    'message': 'API Football Gateway',
+    'version': '1.0.0',
+    'endpoints': {
+        'health': '/health',
+        'leagues': {
+            'raw': '/api/v3/leagues',
+            'lightweight': '/api/v1/leagues',
+            'summary': '/api/v1/leagues/summary'
+        },
+        'teams': '/api/v3/teams',
+        'fixtures': '/api/v3/fixtures',
+        'players': '/api/v3/players',
+        'standings': '/api/v3/standings',
+        'countries': '/api/v3/countries',
+        'seasons': '/api/v3/seasons',
+        'venues': '/api/v3/venues',
+        'odds': '/api/v3/odds',
+        'predictions': '/api/v3/predictions'
+    },
+    'documentation': 'See README.md for usage examples'
+})
+
 # Health check endpoint
 @app.route('/health')
 @log_api_endpoint('health_check')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': time.time(),
-        'version': '1.0.0',
-        'services': {
-            'api_football': 'connected',
-            'cache': 'available' if api_client else 'unavailable'
-        }
-    })
+    # Only the timestamp changes between probes; the rest is pre-serialized
+    return raw_json_response(HEALTH_BODY_HEAD + _dumps(time.time()) + HEALTH_BODY_TAIL)
 
 # API Football proxy endpoints
 # Recommended: 1 call per hour
@@ -104,15 +198,11 @@ def health_check():
 def get_leagues():
     """Get leagues data (raw API response)"""
     try:
-        default_params = {
-            'type': 'league',
-            'current': 'true'
-        }
-        params = default_params | request.args.to_dict()
-        result = get_cached_or_fetch('get_leagues', api_client.get_leagues, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        params = {**DEFAULT_LEAGUE_PARAMS, **request.args} if request.args else DEFAULT_LEAGUE_PARAMS
+        payload = get_cached_raw_or_fetch('get_leagues', api_client.get_leagues, params, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_leagues: {e}")
+        logger.error("Error in get_leagues: %s", e)
         raise APIError(f"Failed to fetch leagues: {str(e)}", 500)
 
 # Lightweight internal API endpoints
@@ -122,11 +212,7 @@ def get_leagues():
 def get_leagues_lightweight():
     """Get leagues data in lightweight internal format"""
     try:
-        default_params = {
-            'type': 'league',
-            'current': 'true'
-        }
-        params = default_params | request.args.to_dict()
+        params = {**DEFAULT_LEAGUE_PARAMS, **request.args} if request.args else DEFAULT_LEAGUE_PARAMS
         
         # Get raw API response
         raw_response = get_cached_or_fetch('get_leagues', api_client.get_leagues, params, Config.CACHE_TTL_STATIC)
@@ -134,46 +220,11 @@ def get_leagues_lightweight():
         # Transform to lightweight format
         transformed_response = LeagueService.transform_api_response(raw_response)
         
-        # Convert to dict for JSON serialization
-        return jsonify({
-            'leagues': [
-                {
-                    'id': league.id,
-                    'name': league.name,
-                    'type': league.type,
-                    'logo_url': league.logo_url,
-                    'country': {
-                        'name': league.country.name,
-                        'code': league.country.code,
-                        'flag_url': league.country.flag_url
-                    },
-                    'seasons': [
-                        {
-                            'year': season.year,
-                            'start_date': season.start_date,
-                            'end_date': season.end_date,
-                            'is_current': season.is_current,
-                            'coverage': {
-                                'fixtures': season.coverage.fixtures,
-                                'standings': season.coverage.standings,
-                                'players': season.coverage.players,
-                                'top_scorers': season.coverage.top_scorers,
-                                'top_assists': season.coverage.top_assists,
-                                'top_cards': season.coverage.top_cards,
-                                'injuries': season.coverage.injuries,
-                                'predictions': season.coverage.predictions,
-                                'odds': season.coverage.odds
-                            }
-                        } for season in league.seasons
-                    ]
-                } for league in transformed_response.leagues
-            ],
-            'total_count': transformed_response.total_count,
-            'current_page': transformed_response.current_page,
-            'total_pages': transformed_response.total_pages
-        })
+        # Dataclass field names match the public JSON keys, so orjson serializes
+        # the model tree directly without an intermediate dict
+        return json_response(transformed_response)
     except Exception as e:
-        logger.error(f"Error in get_leagues_lightweight: {e}")
+        logger.error("Error in get_leagues_lightweight: %s", e)
         raise APIError(f"Failed to fetch leagues: {str(e)}", 500)
 
 @app.route('/api/v1/leagues/summary')
@@ -182,11 +233,7 @@ def get_leagues_lightweight():
 def get_leagues_summary():
     """Get ultra-lightweight league summaries for list views"""
     try:
-        default_params = {
-            'type': 'league',
-            'current': 'true'
-        }
-        params = default_params | request.args.to_dict()
+        params = {**DEFAULT_LEAGUE_PARAMS, **request.args} if request.args else DEFAULT_LEAGUE_PARAMS
         
         # Get raw API response
         raw_response = get_cached_or_fetch('get_leagues', api_client.get_leagues, params, Config.CACHE_TTL_STATIC)
@@ -194,9 +241,9 @@ def get_leagues_summary():
         # Transform to summary format
         summary_response = LeagueService.get_league_summaries(raw_response)
         
-        return jsonify(summary_response)
+        return json_response(summary_response)
     except Exception as e:
-        logger.error(f"Error in get_leagues_summary: {e}")
+        logger.error("Error in get_leagues_summary: %s", e)
         raise APIError(f"Failed to fetch league summaries: {str(e)}", 500)
 
 @app.route('/api/v3/teams')
@@ -204,11 +251,10 @@ def get_leagues_summary():
 def get_teams():
     """Get teams data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_teams', api_client.get_teams, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_teams', api_client.get_teams, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_teams: {e}")
+        logger.error("Error in get_teams: %s", e)
         raise APIError(f"Failed to fetch teams: {str(e)}", 500)
 
 @app.route('/api/v3/fixtures')
@@ -217,11 +263,10 @@ def get_teams():
 def get_fixtures():
     """Get fixtures data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_fixtures', api_client.get_fixtures, params, Config.CACHE_TTL_LIVE)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_fixtures', api_client.get_fixtures, Config.CACHE_TTL_LIVE)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_fixtures: {e}")
+        logger.error("Error in get_fixtures: %s", e)
         raise APIError(f"Failed to fetch fixtures: {str(e)}", 500)
 
 @app.route('/api/v3/players')
@@ -229,11 +274,10 @@ def get_fixtures():
 def get_players():
     """Get players data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_players', api_client.get_players, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_players', api_client.get_players, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_players: {e}")
+        logger.error("Error in get_players: %s", e)
         raise APIError(f"Failed to fetch players: {str(e)}", 500)
 
 @app.route('/api/v3/standings')
@@ -241,11 +285,10 @@ def get_players():
 def get_standings():
     """Get standings data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_standings', api_client.get_standings, params, Config.CACHE_TTL_LIVE)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_standings', api_client.get_standings, Config.CACHE_TTL_LIVE)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_standings: {e}")
+        logger.error("Error in get_standings: %s", e)
         raise APIError(f"Failed to fetch standings: {str(e)}", 500)
 
 @app.route('/api/v3/countries')
@@ -253,11 +296,10 @@ def get_standings():
 def get_countries():
     """Get countries data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_countries', api_client.get_countries, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_countries', api_client.get_countries, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_countries: {e}")
+        logger.error("Error in get_countries: %s", e)
         raise APIError(f"Failed to fetch countries: {str(e)}", 500)
 
 @app.route('/api/v3/seasons')
@@ -265,11 +307,10 @@ def get_countries():
 def get_seasons():
     """Get seasons data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_seasons', api_client.get_seasons, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_seasons', api_client.get_seasons, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_seasons: {e}")
+        logger.error("Error in get_seasons: %s", e)
         raise APIError(f"Failed to fetch seasons: {str(e)}", 500)
 
 @app.route('/api/v3/venues')
@@ -277,11 +318,10 @@ def get_seasons():
 def get_venues():
     """Get venues data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_venues', api_client.get_venues, params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_venues', api_client.get_venues, Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_venues: {e}")
+        logger.error("Error in get_venues: %s", e)
         raise APIError(f"Failed to fetch venues: {str(e)}", 500)
 
 @app.route('/api/v3/odds')
@@ -289,11 +329,10 @@ def get_venues():
 def get_odds():
     """Get odds data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_odds', api_client.get_odds, params, Config.CACHE_TTL_LIVE)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_odds', api_client.get_odds, Config.CACHE_TTL_LIVE)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_odds: {e}")
+        logger.error("Error in get_odds: %s", e)
         raise APIError(f"Failed to fetch odds: {str(e)}", 500)
 
 @app.route('/api/v3/predictions')
@@ -301,11 +340,10 @@ def get_odds():
 def get_predictions():
     """Get predictions data"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch('get_predictions', api_client.get_predictions, params, Config.CACHE_TTL_LIVE)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch('get_predictions', api_client.get_predictions, Config.CACHE_TTL_LIVE)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_predictions: {e}")
+        logger.error("Error in get_predictions: %s", e)
         raise APIError(f"Failed to fetch predictions: {str(e)}", 500)
 
 # Generic catch-all route for any other API Football endpoints
@@ -314,50 +352,37 @@ def get_predictions():
 def get_custom_endpoint(endpoint):
     """Handle any other API Football endpoints"""
     try:
-        params = request.args.to_dict()
-        result = get_cached_or_fetch(f'get_custom_endpoint_{endpoint}', 
-                                   lambda **kwargs: api_client.get_custom_endpoint(endpoint, **kwargs), 
-                                   params, Config.CACHE_TTL_STATIC)
-        return jsonify(result)
+        payload = get_cached_query_or_fetch(f'get_custom_endpoint_{endpoint}', 
+                                            lambda **kwargs: api_client.get_custom_endpoint(endpoint, **kwargs), 
+                                            Config.CACHE_TTL_STATIC)
+        return raw_json_response(payload)
     except Exception as e:
-        logger.error(f"Error in get_custom_endpoint for {endpoint}: {e}")
+        logger.error("Error in get_custom_endpoint for %s: %s", endpoint, e)
         raise APIError(f"Failed to fetch {endpoint}: {str(e)}", 500)
 
 # Root endpoint
 @app.route('/')
 def root():
     """Root endpoint with API information"""
-    return jsonify({
-        'message': 'API Football Gateway',
-        'version': '1.0.0',
-        'endpoints': {
-            'health': '/health',
-            'leagues': {
-                'raw': '/api/v3/leagues',
-                'lightweight': '/api/v1/leagues',
-                'summary': '/api/v1/leagues/summary'
-            },
-            'teams': '/api/v3/teams',
-            'fixtures': '/api/v3/fixtures',
-            'players': '/api/v3/players',
-            'standings': '/api/v3/standings',
-            'countries': '/api/v3/countries',
-            'seasons': '/api/v3/seasons',
-            'venues': '/api/v3/venues',
-            'odds': '/api/v3/odds',
-            'predictions': '/api/v3/predictions'
-        },
-        'documentation': 'See README.md for usage examples'
-    })
+    return raw_json_response(ROOT_BODY)
 
 if __name__ == '__main__':
+    # The built-in server (and its debugger/reloader) is for development only
+    if Config.FLASK_ENV.lower() == 'production':
+        logger.error(
+            "Refusing to start the development server in production - "
+            "run under a WSGI server instead, e.g. gunicorn -w 4 -k gthread --threads 32 app:app"
+        )
+        exit(1)
+    
     logger.info("Starting API Football Gateway...")
-    logger.info(f"Environment: {Config.FLASK_ENV}")
-    logger.info(f"Debug mode: {Config.FLASK_DEBUG}")
-    logger.info(f"Log level: {Config.LOG_LEVEL}")
-    logger.info(f"Logs directory: {Config.LOGS_DIR}")
+    logger.info("Environment: %s", Config.FLASK_ENV)
+    logger.info("Debug mode: %s", Config.FLASK_DEBUG)
+    logger.info("Log level: %s", Config.LOG_LEVEL)
+    logger.info("Logs directory: %s", Config.LOGS_DIR)
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=Config.FLASK_DEBUG
+        debug=Config.FLASK_DEBUG,
+        threaded=True
     )
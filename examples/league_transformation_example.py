@@ -2,7 +2,8 @@
 Example demonstrating the transformation from API Football response to lightweight internal models
 """
 
-from models.league_models import LeagueResponse, LeagueSummary
+import orjson
+from models.league_models import Coverage, LeagueResponse, LeagueSummary
 from services.league_service import LeagueService
 
 # Example API Football response (simplified)
@@ -105,13 +106,14 @@ def demonstrate_transformation():
     
     # Size comparison
     print("\n=== SIZE COMPARISON ===")
-    original_size = len(str(api_response))
-    lightweight_size = len(str(league_response.__dict__))
-    summary_size = len(str(summary_response))
+    # Serialized the way the API serves them; Coverage expands through to_dict()
+    original_size = len(orjson.dumps(api_response))
+    lightweight_size = len(orjson.dumps(league_response, default=Coverage.to_dict))
+    summary_size = len(orjson.dumps(summary_response))
     
-    print(f"Original API response: {original_size} characters")
-    print(f"Lightweight format: {lightweight_size} characters")
-    print(f"Summary format: {summary_size} characters")
+    print(f"Original API response: {original_size} bytes")
+    print(f"Lightweight format: {lightweight_size} bytes")
+    print(f"Summary format: {summary_size} bytes")
     print(f"Size reduction (lightweight): {((original_size - lightweight_size) / original_size * 100):.1f}%")
     print(f"Size reduction (summary): {((original_size - summary_size) / original_size * 100):.1f}%")
 
@@ -1,9 +1,14 @@
-import json
-import hashlib
+import fnmatch
 import logging
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from typing import Any, Optional, Callable
+import orjson
 import redis
+import xxhash
+import zstandard
 from config import Config
 from utils.logging_config import get_logger
 from middleware.request_logger import log_cache_operation
@@ -11,86 +16,281 @@ from middleware.request_logger import log_cache_operation
 # Get specialized logger
 logger = get_logger('cache')
 
+# Bound once so hot paths skip the module attribute lookup
+_dumps = orjson.dumps
+_loads = orjson.loads
+_CACHE_KEY_OPTIONS = orjson.OPT_SORT_KEYS
+
+# Payloads larger than this are zstd-compressed before being stored in Redis
+COMPRESSION_THRESHOLD = 4096
+COMPRESSION_LEVEL = 3
+
+# One-byte prefix marking how a stored payload is encoded
+_PLAIN_PREFIX = b'R'
+_ZSTD_PREFIX = b'Z'
+
+# zstd (de)compressors are not thread safe, so keep one pair per thread
+_codecs = threading.local()
+
+def _get_codecs() -> tuple:
+    """Return this thread's (compressor, decompressor) pair"""
+    codecs = getattr(_codecs, 'pair', None)
+    if codecs is None:
+        codecs = _codecs.pair = (
+            zstandard.ZstdCompressor(level=COMPRESSION_LEVEL),
+            zstandard.ZstdDecompressor()
+        )
+    return codecs
+
+def _encode_payload(json_data: bytes) -> bytes:
+    """Prefix and, for large payloads, compress JSON bytes for storage"""
+    if len(json_data) > COMPRESSION_THRESHOLD:
+        return _ZSTD_PREFIX + _get_codecs()[0].compress(json_data)
+    return _PLAIN_PREFIX + json_data
+
+def _decode_payload(stored: bytes) -> bytes:
+    """Reverse _encode_payload, returning the original JSON bytes"""
+    prefix = stored[:1]
+    if prefix == _ZSTD_PREFIX:
+        return _get_codecs()[1].decompress(stored[1:])
+    if prefix == _PLAIN_PREFIX:
+        return stored[1:]
+    # Entries written before payload prefixes were introduced
+    return stored
+
+# In-process cache sizing; entries live briefly so workers never drift far from Redis
+LOCAL_CACHE_MAXSIZE = 512
+LOCAL_CACHE_TTL_STATIC = 300
+LOCAL_CACHE_TTL_LIVE = 10
+
+
+class LocalCache:
+    """Thread-safe, TTL-aware LRU for hot keys, checked before Redis"""
+    
+    def __init__(self, maxsize: int = LOCAL_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def delete_matching(self, pattern: str) -> int:
+        """Remove entries whose key matches a Redis-style glob pattern"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+
+def _local_ttl(ttl: Optional[int]) -> int:
+    """In-process TTL for an entry whose Redis TTL is ttl (None if unknown)"""
+    if ttl is None or ttl <= Config.CACHE_TTL_LIVE:
+        return min(ttl or LOCAL_CACHE_TTL_LIVE, LOCAL_CACHE_TTL_LIVE)
+    return min(ttl, LOCAL_CACHE_TTL_STATIC)
+
+
 class CacheManager:
     """Redis-based cache manager for API responses"""
     
     def __init__(self):
+        self.local = LocalCache()
         try:
-            self.redis_client = redis.from_url(Config.REDIS_URL, decode_responses=True)
+            self.redis_client = redis.from_url(Config.REDIS_URL, decode_responses=False)
             # Test connection
             self.redis_client.ping()
             self.available = True
             logger.info("Redis cache connection established")
         except Exception as e:
-            logger.warning(f"Redis cache unavailable: {e}")
+            logger.warning("Redis cache unavailable: %s", e)
             self.redis_client = None
             self.available = False
     
     def _generate_cache_key(self, endpoint: str, params: dict) -> str:
         """Generate a unique cache key for the request"""
-        # Sort params to ensure consistent keys
-        sorted_params = sorted(params.items()) if params else []
-        key_string = f"{endpoint}:{json.dumps(sorted_params, sort_keys=True)}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # OPT_SORT_KEYS gives consistent keys regardless of param order in a single C pass
+        key_bytes = endpoint.encode() + b':' + _dumps(params or {}, option=_CACHE_KEY_OPTIONS)
+        # Keys only need to be collision resistant, not cryptographically strong
+        return xxhash.xxh3_128_hexdigest(key_bytes)
     
-    def get(self, key: str) -> Optional[dict]:
-        """Get cached data with logging"""
+    def key_for(self, endpoint: str, query_string: bytes) -> str:
+        """Generate a cache key straight from a raw request query string"""
+        # Sorting the raw pairs makes the key independent of parameter order
+        query = b'&'.join(sorted(query_string.split(b'&'))) if query_string else b''
+        return xxhash.xxh3_128_hexdigest(endpoint.encode() + b'?' + query)
+    
+    def get_raw(self, key: str, ttl: Optional[int] = None) -> Optional[bytes]:
+        """
+        Get cached JSON bytes without parsing them
+        
+        Args:
+            key: Cache key
+            ttl: Redis TTL the entry was stored with, used to size the in-process TTL
+        """
+        local_data = self.local.get(key)
+        if local_data is not None:
+            logger.debug("CACHE_LOCAL_HIT - Key: %s - Size: %d bytes", key, len(local_data))
+            return local_data
+        
         if not self.available:
-            logger.debug(f"CACHE_MISS - Key: {key} - Reason: Cache unavailable")
+            logger.debug("CACHE_MISS - Key: %s - Reason: Cache unavailable", key)
             return None
         
         try:
             cached_data = self.redis_client.get(key)
             if cached_data:
-                data = json.loads(cached_data)
-                logger.debug(f"CACHE_HIT - Key: {key} - Size: {len(cached_data)} bytes")
-                log_cache_operation('GET', key, hit=True, size=len(cached_data))
-                return data
+                logger.debug("CACHE_HIT - Key: %s - Size: %d bytes", key, len(cached_data))
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_cache_operation('GET', key, hit=True, size=len(cached_data))
+                json_data = _decode_payload(cached_data)
+                self.local.set(key, json_data, _local_ttl(ttl))
+                return json_data
             else:
-                logger.debug(f"CACHE_MISS - Key: {key} - Reason: Not found")
-                log_cache_operation('GET', key, hit=False)
+                logger.debug("CACHE_MISS - Key: %s - Reason: Not found", key)
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_cache_operation('GET', key, hit=False)
         except Exception as e:
-            logger.error(f"CACHE_ERROR - GET - Key: {key} - Error: {e}")
-            log_cache_operation('GET', key, hit=False)
+            logger.error("CACHE_ERROR - GET - Key: %s - Error: %s", key, e)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_cache_operation('GET', key, hit=False)
         
         return None
     
-    def set(self, key: str, data: dict, ttl: int) -> bool:
-        """Set cached data with TTL and logging"""
+    def get(self, key: str, ttl: Optional[int] = None) -> Optional[dict]:
+        """Get cached data with logging"""
+        cached_data = self.get_raw(key, ttl)
+        if cached_data is None:
+            return None
+        
+        try:
+            return _loads(cached_data)
+        except orjson.JSONDecodeError as e:
+            logger.error("CACHE_ERROR - DECODE - Key: %s - Error: %s", key, e)
+            return None
+    
+    def set_raw(self, key: str, json_data: bytes, ttl: int) -> bool:
+        """Set already-serialized JSON bytes with TTL and logging"""
+        self.local.set(key, json_data, _local_ttl(ttl))
+        
         if not self.available:
-            logger.debug(f"CACHE_SET_SKIP - Key: {key} - Reason: Cache unavailable")
+            logger.debug("CACHE_SET_SKIP - Key: %s - Reason: Cache unavailable", key)
             return False
         
         try:
-            json_data = json.dumps(data)
-            self.redis_client.setex(key, ttl, json_data)
-            logger.debug(f"CACHE_SET - Key: {key} - TTL: {ttl}s - Size: {len(json_data)} bytes")
-            log_cache_operation('SET', key, ttl=ttl, size=len(json_data))
+            payload = _encode_payload(json_data)
+            self.redis_client.setex(key, ttl, payload)
+            logger.debug(
+                "CACHE_SET - Key: %s - TTL: %ss - Size: %d bytes - Stored: %d bytes",
+                key, ttl, len(json_data), len(payload)
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                log_cache_operation('SET', key, ttl=ttl, size=len(payload))
             return True
         except Exception as e:
-            logger.error(f"CACHE_ERROR - SET - Key: {key} - TTL: {ttl}s - Error: {e}")
-            log_cache_operation('SET', key, ttl=ttl)
+            logger.error("CACHE_ERROR - SET - Key: %s - TTL: %ss - Error: %s", key, ttl, e)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_cache_operation('SET', key, ttl=ttl)
             return False
     
+    def set(self, key: str, data: dict, ttl: int) -> bool:
+        """Set cached data with TTL and logging"""
+        return self.set_raw(key, _dumps(data), ttl)
+    
     def delete(self, key: str) -> bool:
         """Delete cached data with logging"""
+        self.local.delete(key)
+        
         if not self.available:
-            logger.debug(f"CACHE_DELETE_SKIP - Key: {key} - Reason: Cache unavailable")
+            logger.debug("CACHE_DELETE_SKIP - Key: %s - Reason: Cache unavailable", key)
             return False
         
         try:
             self.redis_client.delete(key)
-            logger.debug(f"CACHE_DELETE - Key: {key}")
-            log_cache_operation('DELETE', key)
+            logger.debug("CACHE_DELETE - Key: %s", key)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_cache_operation('DELETE', key)
             return True
         except Exception as e:
-            logger.error(f"CACHE_ERROR - DELETE - Key: {key} - Error: {e}")
-            log_cache_operation('DELETE', key)
+            logger.error("CACHE_ERROR - DELETE - Key: %s - Error: %s", key, e)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_cache_operation('DELETE', key)
             return False
 
+class _InflightCall:
+    """A pending fetch that concurrent requests for the same key wait on"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InflightRequests:
+    """Coalesces concurrent cache misses for the same key into a single fetch"""
+    
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def run(self, key: str, func: Callable[[], Any]) -> Any:
+        """Run func for key, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InflightCall()
+        
+        if not is_leader:
+            logger.debug("CACHE_COALESCE - Key: %s - Waiting for in-flight fetch", key)
+            if call.event.wait(self.timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The first caller is taking too long - fetch independently
+            logger.warning("CACHE_COALESCE_TIMEOUT - Key: %s - Timeout: %ss", key, self.timeout)
+            return func()
+        
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
 # Global cache manager instance
 cache_manager = CacheManager()
 
+# Global in-flight fetch registry used to prevent cache stampedes
+inflight_requests = InflightRequests()
+
 def cache_response(ttl: int = None, endpoint_type: str = 'static'):
     """
     Decorator to cache API responses
@@ -117,36 +317,50 @@ def cache_response(ttl: int = None, endpoint_type: str = 'static'):
             # Try to get from cache
             cached_data = cache_manager.get(cache_key)
             if cached_data is not None:
-                logger.info(f"Cache hit for {endpoint}")
+                logger.info("Cache hit for %s", endpoint)
                 return cached_data
             
             # Execute function and cache result
-            logger.info(f"Cache miss for {endpoint}, executing function")
+            logger.info("Cache miss for %s, executing function", endpoint)
             result = func(*args, **kwargs)
             
             # Cache the result - only cache if it's a dict (raw data), not a Flask Response
             if result and isinstance(result, dict):
                 cache_manager.set(cache_key, result, cache_ttl)
-                logger.info(f"Cached result for {endpoint} with TTL {cache_ttl}s")
+                logger.info("Cached result for %s with TTL %ss", endpoint, cache_ttl)
             elif result:
-                logger.debug(f"Skipping cache for {endpoint} - result is not a dict (type: {type(result).__name__})")
+                logger.debug("Skipping cache for %s - result is not a dict (type: %s)", endpoint, type(result).__name__)
             
             return result
         
         return wrapper
     return decorator
 
-def invalidate_cache_pattern(pattern: str) -> bool:
+def invalidate_cache_pattern(pattern: str, batch_size: int = 500) -> bool:
     """Invalidate cache entries matching a pattern"""
+    cache_manager.local.delete_matching(pattern)
+    
     if not cache_manager.available:
         return False
     
     try:
-        keys = cache_manager.redis_client.keys(pattern)
-        if keys:
-            cache_manager.redis_client.delete(*keys)
-            logger.info(f"Invalidated {len(keys)} cache entries matching {pattern}")
+        # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS
+        pipe = cache_manager.redis_client.pipeline(transaction=False)
+        pending = 0
+        deleted = 0
+        for key in cache_manager.redis_client.scan_iter(match=pattern, count=batch_size):
+            pipe.delete(key)
+            pending += 1
+            if pending >= batch_size:
+                pipe.execute()
+                deleted += pending
+                pending = 0
+        if pending:
+            pipe.execute()
+            deleted += pending
+        if deleted:
+            logger.info("Invalidated %s cache entries matching %s", deleted, pattern)
         return True
     except Exception as e:
-        logger.error(f"Error invalidating cache pattern {pattern}: {e}")
+        logger.error("Error invalidating cache pattern %s: %s", pattern, e)
         return False
@@ -1,4 +1,8 @@
 import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask import Flask
@@ -66,3 +70,92 @@ def custom_rate_limit(limit: str):
 LIVE_DATA_LIMIT = "30 per minute"  # More restrictive for live data
 STATIC_DATA_LIMIT = "100 per minute"  # Standard limit for static data
 HEAVY_ENDPOINT_LIMIT = "10 per minute"  # For computationally expensive endpoints
+
+
+class UpstreamRateLimiter:
+    """
+    AIMD concurrency limiter driven by API Football's rate limit signals
+    
+    Concurrency is halved whenever upstream answers 429 and grows by 0.5 for
+    every other response, so the gateway backs off before 429s cascade. A 429's
+    Retry-After (capped at max_retry_after seconds) also holds back new requests
+    until it expires.
+    """
+    
+    REMAINING_HEADERS = ('X-RateLimit-Remaining', 'X-RateLimit-Requests-Remaining')
+    
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, max_retry_after: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retry_after = max_retry_after
+        self.remaining = None
+        self._capacity = float(max_concurrency)
+        self._in_flight = 0
+        # time.monotonic() before which no new request is sent, or None
+        self._retry_at = None
+        self._condition = threading.Condition()
+    
+    def current_capacity(self) -> int:
+        """Current number of upstream requests allowed in flight"""
+        return max(self.min_concurrency, int(self._capacity))
+    
+    def __enter__(self):
+        with self._condition:
+            while True:
+                if self._retry_at is not None:
+                    delay = self._retry_at - time.monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    self._retry_at = None
+                if self._in_flight < self.current_capacity():
+                    break
+                self._condition.wait()
+            self._in_flight += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+        return False
+    
+    def record_response(self, status_code: int, headers) -> None:
+        """Update limiter state from an upstream response"""
+        with self._condition:
+            for header in self.REMAINING_HEADERS:
+                remaining = headers.get(header)
+                if remaining is not None:
+                    self.remaining = remaining
+                    break
+            
+            if status_code == 429:
+                self._capacity = max(self.min_concurrency, self._capacity * 0.5)
+                retry_after = _parse_retry_after(headers.get('Retry-After'))
+                if retry_after:
+                    self._retry_at = time.monotonic() + min(retry_after, self.max_retry_after)
+                logger.warning(
+                    "Upstream rate limited - Capacity reduced to %s - Retry-After: %s",
+                    self.current_capacity(), retry_after
+                )
+            else:
+                # Upstream is accepting requests again
+                self._retry_at = None
+                self._capacity = min(self.max_concurrency, self._capacity + 0.5)
+            
+            self._condition.notify_all()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -1,14 +1,53 @@
+import os
 import time
-import uuid
 import logging
 from flask import request, g
 from functools import wraps
 from utils.logging_config import get_logger, log_request
 
 
+# Log message templates, formatted lazily by the logging framework
+_REQUEST_START_FMT = (
+    "REQUEST_START - ID: %s - %s %s - IP: %s - UA: %.100s - "
+    "Content-Type: %s - Content-Length: %s - Query: %s"
+)
+_REQUEST_COMPLETE_FMT = "REQUEST_COMPLETE - ID: %s - %s %s - Status: %s - Time: %.2fms - Size: %s bytes"
+_SLOW_REQUEST_FMT = "SLOW_REQUEST - ID: %s - %s %s - Time: %.2fms - Status: %s"
+_ENDPOINT_ENTRY_FMT = "ENDPOINT_ENTRY - ID: %s - %s - Args: %s - Kwargs: %s"
+_ENDPOINT_SUCCESS_FMT = "ENDPOINT_SUCCESS - ID: %s - %s"
+_ENDPOINT_ERROR_FMT = "ENDPOINT_ERROR - ID: %s - %s - Error: %s"
+_EXTERNAL_API_FMT = "EXTERNAL_API - ID: %s - API: %s - Endpoint: %s - Method: %s"
+_CACHE_OP_FMT = "CACHE_OP - ID: %s - Operation: %s - Key: %s"
+
+# Component loggers, looked up once instead of per helper call
+_app_logger = get_logger('app')
+_api_logger = get_logger('api_client')
+_cache_logger = get_logger('cache')
+_rate_logger = get_logger('rate_limiter')
+_security_logger = get_logger('security')
+
+
 def generate_request_id():
     """Generate a unique request ID"""
-    return str(uuid.uuid4())[:8]
+    return os.urandom(4).hex()
+
+
+class _LazyQuery:
+    """Renders query parameters for logging only when a handler formats the record"""
+    
+    __slots__ = ('args',)
+    
+    def __init__(self, args):
+        self.args = args
+    
+    def __str__(self):
+        query_params = self.args.to_dict()
+        rendered = str(query_params)
+        if len(rendered) > 200:  # Truncate long query strings to avoid log spam
+            query_params = {k: str(v)[:50] + '...' if len(str(v)) > 50 else v 
+                          for k, v in query_params.items()}
+            rendered = str(query_params)
+        return rendered
 
 
 def setup_request_logging(app):
@@ -17,37 +56,47 @@ def setup_request_logging(app):
     # Get the access logger
     access_logger = get_logger('access')
     
-    @app.before_request
-    def before_request():
-        """Log request start and add request context"""
+    def bind_request_context():
+        """Attach the request ID and client details to g for logging and error responses"""
         # Generate unique request ID
-        request_id = generate_request_id()
-        g.request_id = request_id
+        g.request_id = generate_request_id()
         
         # Store request start time
-        g.request_start_time = time.time()
-        
-        # Extract request details
-        method = request.method
-        path = request.path
-        remote_addr = request.remote_addr
-        user_agent = request.headers.get('User-Agent', 'Unknown')
-        content_type = request.headers.get('Content-Type', '')
-        content_length = request.headers.get('Content-Length', '0')
+        g.request_start_ns = time.perf_counter_ns()
         
-        # Get query parameters (limit to avoid log spam)
-        query_params = dict(request.args)
-        if len(str(query_params)) > 200:  # Truncate long query strings
-            query_params = {k: str(v)[:50] + '...' if len(str(v)) > 50 else v 
-                          for k, v in query_params.items()}
+        # Client details read once here instead of on every error response
+        g.remote_addr = request.remote_addr
+        g.user_agent = request.headers.get('User-Agent', 'Unknown')
+    
+    # Run ahead of every other before_request hook (e.g. the rate limiter), so
+    # error handlers can rely on the context being present
+    app.before_request_funcs.setdefault(None, []).insert(0, bind_request_context)
+    
+    @app.before_request
+    def before_request():
+        """Log request start"""
+        request_id = g.request_id
         
-        # Log request start
-        access_logger.info(
-            f"REQUEST_START - ID: {request_id} - {method} {path} - "
-            f"IP: {remote_addr} - UA: {user_agent[:100]} - "
-            f"Content-Type: {content_type} - Content-Length: {content_length} - "
-            f"Query: {query_params}"
-        )
+        # Skip extracting request details entirely when REQUEST_START would be dropped
+        if access_logger.isEnabledFor(logging.INFO):
+            # Resolve the request proxy once and read everything from the real object
+            req = request._get_current_object()
+            headers = req.headers
+            
+            # Extract request details
+            method = req.method
+            path = req.path
+            remote_addr = g.remote_addr
+            user_agent = headers.get('User-Agent', 'Unknown')
+            content_type = headers.get('Content-Type', '')
+            content_length = headers.get('Content-Length', '0')
+            
+            # Log request start
+            access_logger.info(
+                _REQUEST_START_FMT,
+                request_id, method, path, remote_addr, user_agent,
+                content_type, content_length, _LazyQuery(req.args)
+            )
         
         # Add request ID to response headers (for debugging)
         request.environ['REQUEST_ID'] = request_id
@@ -56,15 +105,16 @@ def setup_request_logging(app):
     def after_request(response):
         """Log request completion with performance metrics"""
         # Calculate response time
-        if hasattr(g, 'request_start_time'):
-            response_time = (time.time() - g.request_start_time) * 1000  # Convert to milliseconds
+        if hasattr(g, 'request_start_ns'):
+            response_time = (time.perf_counter_ns() - g.request_start_ns) / 1_000_000  # Convert to milliseconds
         else:
             response_time = 0
         
         # Get request details
+        req = request._get_current_object()
         request_id = getattr(g, 'request_id', 'unknown')
-        method = request.method
-        path = request.path
+        method = req.method
+        path = req.path
         status_code = response.status_code
         content_length = response.content_length or 0
         
@@ -79,9 +129,8 @@ def setup_request_logging(app):
         # Log request completion
         access_logger.log(
             log_level,
-            f"REQUEST_COMPLETE - ID: {request_id} - {method} {path} - "
-            f"Status: {status_code} - Time: {response_time:.2f}ms - "
-            f"Size: {content_length} bytes"
+            _REQUEST_COMPLETE_FMT,
+            request_id, method, path, status_code, response_time, content_length
         )
         
         # Add request ID to response headers
@@ -90,22 +139,14 @@ def setup_request_logging(app):
         # Log slow requests (over 1 second)
         if response_time > 1000:
             access_logger.warning(
-                f"SLOW_REQUEST - ID: {request_id} - {method} {path} - "
-                f"Time: {response_time:.2f}ms - Status: {status_code}"
+                _SLOW_REQUEST_FMT,
+                request_id, method, path, response_time, status_code
             )
         
         return response
     
-    @app.errorhandler(Exception)
-    def log_exception(error):
-        """Log unhandled exceptions with request context"""
-        request_id = getattr(g, 'request_id', 'unknown')
-        access_logger.error(
-            f"REQUEST_ERROR - ID: {request_id} - {request.method} {request.path} - "
-            f"Error: {str(error)} - Type: {type(error).__name__}",
-            exc_info=True
-        )
-        raise error  # Re-raise the exception
+    # Exceptions are logged and turned into JSON responses by utils.error_handlers;
+    # REQUEST_COMPLETE above records the resulting status in the access log
 
 
 def log_api_endpoint(endpoint_name):
@@ -114,17 +155,16 @@ def log_api_endpoint(endpoint_name):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             request_id = getattr(g, 'request_id', 'unknown')
-            logger = get_logger('app')
             
             # Log endpoint entry
-            logger.info(f"ENDPOINT_ENTRY - ID: {request_id} - {endpoint_name} - Args: {args} - Kwargs: {kwargs}")
+            _app_logger.info(_ENDPOINT_ENTRY_FMT, request_id, endpoint_name, args, kwargs)
             
             try:
                 result = f(*args, **kwargs)
-                logger.info(f"ENDPOINT_SUCCESS - ID: {request_id} - {endpoint_name}")
+                _app_logger.info(_ENDPOINT_SUCCESS_FMT, request_id, endpoint_name)
                 return result
             except Exception as e:
-                logger.error(f"ENDPOINT_ERROR - ID: {request_id} - {endpoint_name} - Error: {str(e)}")
+                _app_logger.error(_ENDPOINT_ERROR_FMT, request_id, endpoint_name, e)
                 raise
         
         return decorated_function
@@ -133,92 +173,105 @@ def log_api_endpoint(endpoint_name):
 
 def log_external_api_call(api_name, endpoint, method='GET', params=None, response_time=None, status_code=None, error=None):
     """Log external API calls with detailed information"""
-    api_logger = get_logger('api_client')
+    # Log at appropriate level, skipping message assembly when it would be dropped
+    if error or (status_code and status_code >= 400):
+        log_level = logging.ERROR
+    else:
+        log_level = logging.INFO
+    if not _api_logger.isEnabledFor(log_level):
+        return
+    
     request_id = getattr(g, 'request_id', 'unknown')
     
     # Build log message
-    log_parts = [
-        f"EXTERNAL_API - ID: {request_id}",
-        f"API: {api_name}",
-        f"Endpoint: {endpoint}",
-        f"Method: {method}"
-    ]
+    log_format = [_EXTERNAL_API_FMT]
+    log_args = [request_id, api_name, endpoint, method]
     
     if params:
         # Truncate long parameter values
         truncated_params = {k: str(v)[:100] + '...' if len(str(v)) > 100 else v 
                           for k, v in params.items()}
-        log_parts.append(f"Params: {truncated_params}")
+        log_format.append("Params: %s")
+        log_args.append(truncated_params)
     
     if response_time is not None:
-        log_parts.append(f"Time: {response_time:.2f}ms")
+        log_format.append("Time: %.2fms")
+        log_args.append(response_time)
     
     if status_code:
-        log_parts.append(f"Status: {status_code}")
+        log_format.append("Status: %s")
+        log_args.append(status_code)
     
     if error:
-        log_parts.append(f"Error: {str(error)}")
+        log_format.append("Error: %s")
+        log_args.append(error)
     
-    log_message = " - ".join(log_parts)
-    
-    # Log at appropriate level
-    if error or (status_code and status_code >= 400):
-        api_logger.error(log_message)
-    else:
-        api_logger.info(log_message)
+    _api_logger.log(log_level, " - ".join(log_format), *log_args)
 
 
 def log_cache_operation(operation, key, hit=None, ttl=None, size=None):
     """Log cache operations with performance metrics"""
-    cache_logger = get_logger('cache')
+    if not _cache_logger.isEnabledFor(logging.DEBUG):
+        return
+    
     request_id = getattr(g, 'request_id', 'unknown')
     
-    log_parts = [
-        f"CACHE_OP - ID: {request_id}",
-        f"Operation: {operation}",
-        f"Key: {key}"
-    ]
+    log_format = [_CACHE_OP_FMT]
+    log_args = [request_id, operation, key]
     
     if hit is not None:
-        log_parts.append(f"Hit: {hit}")
+        log_format.append("Hit: %s")
+        log_args.append(hit)
     
     if ttl is not None:
-        log_parts.append(f"TTL: {ttl}s")
+        log_format.append("TTL: %ss")
+        log_args.append(ttl)
     
     if size is not None:
-        log_parts.append(f"Size: {size} bytes")
+        log_format.append("Size: %s bytes")
+        log_args.append(size)
     
-    log_message = " - ".join(log_parts)
-    cache_logger.debug(log_message)
+    _cache_logger.debug(" - ".join(log_format), *log_args)
 
 
 def log_rate_limit_event(limit_type, remaining, reset_time, endpoint=None):
     """Log rate limiting events"""
-    rate_limiter_logger = get_logger('rate_limiter')
     request_id = getattr(g, 'request_id', 'unknown')
     
-    log_message = (
-        f"RATE_LIMIT - ID: {request_id} - Type: {limit_type} - "
-        f"Remaining: {remaining} - Reset: {reset_time}"
-    )
-    
     if endpoint:
-        log_message += f" - Endpoint: {endpoint}"
-    
-    rate_limiter_logger.warning(log_message)
+        _rate_logger.warning(
+            "RATE_LIMIT - ID: %s - Type: %s - Remaining: %s - Reset: %s - Endpoint: %s",
+            request_id, limit_type, remaining, reset_time, endpoint
+        )
+    else:
+        _rate_logger.warning(
+            "RATE_LIMIT - ID: %s - Type: %s - Remaining: %s - Reset: %s",
+            request_id, limit_type, remaining, reset_time
+        )
 
 
-def log_security_event(event_type, details, severity='INFO'):
-    """Log security-related events"""
-    security_logger = get_logger('security')
+def log_security_event(event_type, details, *args, severity='INFO'):
+    """Log security-related events; with args, details is a %-format filled in only if logged"""
     request_id = getattr(g, 'request_id', 'unknown')
     
-    log_message = f"SECURITY - ID: {request_id} - Event: {event_type} - Details: {details}"
-    
     # Log at appropriate level based on severity
-    if severity.upper() == 'CRITICAL':
-        security_logger.critical(log_message)
-    elif severity.upper() == 'WARNING':
-        security_logger.warning(log_message)
+    severity = severity.upper()
+    if severity == 'CRITICAL':
+        log_level = logging.CRITICAL
+    elif severity == 'WARNING':
+        log_level = logging.WARNING
     else:
-        security_logger.info(log_message)
+        log_level = logging.INFO
+    
+    if args:
+        _security_logger.log(
+            log_level,
+            "SECURITY - ID: %s - Event: %s - Details: " + details,
+            request_id, event_type, *args
+        )
+    else:
+        _security_logger.log(
+            log_level,
+            "SECURITY - ID: %s - Event: %s - Details: %s",
+            request_id, event_type, details
+        )
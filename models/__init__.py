@@ -8,7 +8,8 @@ from .league_models import (
     Season,
     Coverage,
     LeagueResponse,
-    LeagueSummary
+    LeagueSummary,
+    LeagueTable
 )
 
 __all__ = [
@@ -17,5 +18,6 @@ __all__ = [
     'Season',
     'Coverage',
     'LeagueResponse',
-    'LeagueSummary'
+    'LeagueSummary',
+    'LeagueTable'
 ]
@@ -2,41 +2,91 @@
 Data models for league-related API responses
 """
 
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 
-@dataclass
+def _coverage_flag(bit: int) -> property:
+    """Read-only boolean view over a single Coverage bit"""
+    mask = 1 << bit
+    return property(lambda self: bool(self.bits & mask))
+
+
 class Coverage:
-    """Simplified coverage information for a season"""
-    fixtures: bool
-    standings: bool
-    players: bool
-    top_scorers: bool
-    top_assists: bool
-    top_cards: bool
-    injuries: bool
-    predictions: bool
-    odds: bool
+    """Simplified coverage information for a season, packed into a bitmask"""
+    
+    # Bit position of each flag is its index in FIELDS
+    FIELDS = (
+        'fixtures',
+        'standings',
+        'players',
+        'top_scorers',
+        'top_assists',
+        'top_cards',
+        'injuries',
+        'predictions',
+        'odds'
+    )
+    
+    __slots__ = ('bits',)
+    
+    fixtures = _coverage_flag(0)
+    standings = _coverage_flag(1)
+    players = _coverage_flag(2)
+    top_scorers = _coverage_flag(3)
+    top_assists = _coverage_flag(4)
+    top_cards = _coverage_flag(5)
+    injuries = _coverage_flag(6)
+    predictions = _coverage_flag(7)
+    odds = _coverage_flag(8)
+    
+    def __init__(self, bits: int = 0, **flags: bool):
+        """Build from packed bits and/or flags by name, e.g. Coverage(fixtures=True, odds=False)"""
+        for name, value in flags.items():
+            if name not in self.FIELDS:
+                raise TypeError(f"Coverage() got an unexpected keyword argument '{name}'")
+            bit = 1 << self.FIELDS.index(name)
+            bits = bits | bit if value else bits & ~bit
+        self.bits = bits
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Coverage):
+            return NotImplemented
+        return self.bits == other.bits
+    
+    def __repr__(self) -> str:
+        flags = ', '.join(f"{name}={getattr(self, name)}" for name in self.FIELDS)
+        return f"Coverage({flags})"
+    
+    def to_dict(self) -> Dict[str, bool]:
+        """Expand the bitmask into the public JSON representation"""
+        bits = self.bits
+        return {name: bool(bits & (1 << i)) for i, name in enumerate(self.FIELDS)}
     
     @classmethod
     def from_api_data(cls, coverage_data: Dict[str, Any]) -> 'Coverage':
         """Create Coverage from API response data"""
-        return cls(
-            fixtures=coverage_data.get('fixtures', {}).get('events', False),
-            standings=coverage_data.get('standings', False),
-            players=coverage_data.get('players', False),
-            top_scorers=coverage_data.get('top_scorers', False),
-            top_assists=coverage_data.get('top_assists', False),
-            top_cards=coverage_data.get('top_cards', False),
-            injuries=coverage_data.get('injuries', False),
-            predictions=coverage_data.get('predictions', False),
-            odds=coverage_data.get('odds', False)
+        flags = (
+            coverage_data.get('fixtures', {}).get('events', False),
+            coverage_data.get('standings', False),
+            coverage_data.get('players', False),
+            coverage_data.get('top_scorers', False),
+            coverage_data.get('top_assists', False),
+            coverage_data.get('top_cards', False),
+            coverage_data.get('injuries', False),
+            coverage_data.get('predictions', False),
+            coverage_data.get('odds', False)
         )
+        bits = 0
+        for i, flag in enumerate(flags):
+            if flag:
+                bits |= 1 << i
+        return cls(bits)
 
 
-@dataclass
+@dataclass(slots=True)
 class Season:
     """Simplified season information"""
     year: int
@@ -57,12 +107,17 @@ class Season:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Country:
     """Simplified country information"""
     name: str
     code: str
     flag_url: str
+    # Casefolded name for search, computed once per instance
+    _name_cf: str = field(default='', init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._name_cf = (self.name or '').casefold()
     
     @classmethod
     def from_api_data(cls, country_data: Dict[str, Any]) -> 'Country':
@@ -74,7 +129,7 @@ class Country:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class League:
     """Simplified league information"""
     id: int
@@ -83,6 +138,11 @@ class League:
     logo_url: str
     country: Country
     seasons: List[Season]
+    # Casefolded name for search, computed once per instance
+    _name_cf: str = field(default='', init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._name_cf = (self.name or '').casefold()
     
     @classmethod
     def from_api_data(cls, league_data: Dict[str, Any]) -> 'League':
@@ -99,9 +159,16 @@ class League:
             country=Country.from_api_data(country_info),
             seasons=[Season.from_api_data(season) for season in seasons_data]
         )
+    
+    def current_season(self) -> Optional[Season]:
+        """Return the first current season, if any"""
+        for season in self.seasons:
+            if season.is_current:
+                return season
+        return None
 
 
-@dataclass
+@dataclass(slots=True)
 class LeagueSummary:
     """Ultra-lightweight league summary for list views"""
     id: int
@@ -114,10 +181,7 @@ class LeagueSummary:
     @classmethod
     def from_league(cls, league: League) -> 'LeagueSummary':
         """Create LeagueSummary from League object"""
-        current_season = next(
-            (season for season in league.seasons if season.is_current), 
-            None
-        )
+        current_season = league.current_season()
         
         return cls(
             id=league.id,
@@ -129,13 +193,80 @@ class LeagueSummary:
         )
 
 
-@dataclass
+class LeagueTable:
+    """
+    Column-oriented view of a league list for search and filtering
+    
+    Casefolded names are packed into one separator-joined string per column, so a
+    substring search is a few C-level str.find calls rather than a Python-level
+    test per league. League objects are only returned for the matching rows.
+    """
+    
+    SEPARATOR = '\x00'
+    
+    __slots__ = ('leagues', 'ids', 'country_codes', 'types_cf', '_names', '_country_names')
+    
+    def __init__(self, leagues: List[League]):
+        self.leagues = list(leagues)
+        self.ids = [league.id for league in self.leagues]
+        self.country_codes = [league.country.code for league in self.leagues]
+        self.types_cf = [(league.type or '').casefold() for league in self.leagues]
+        self._names = self._pack([league._name_cf for league in self.leagues])
+        self._country_names = self._pack([league.country._name_cf for league in self.leagues])
+    
+    @classmethod
+    def _pack(cls, values: List[str]) -> tuple:
+        """Join a column into one string, returning it with each row's start offset"""
+        offsets = []
+        position = 0
+        for value in values:
+            offsets.append(position)
+            position += len(value) + 1
+        return cls.SEPARATOR.join(values) + cls.SEPARATOR, offsets
+    
+    @staticmethod
+    def _find_rows(column: tuple, query: str, rows: set) -> None:
+        """Add the index of every row in the packed column that contains query"""
+        blob, offsets = column
+        last_row = len(offsets) - 1
+        position = blob.find(query)
+        while position != -1:
+            row = bisect_right(offsets, position) - 1
+            rows.add(row)
+            if row == last_row:
+                break
+            position = blob.find(query, offsets[row + 1])  # Skip the rest of this row
+    
+    def search(self, query: str) -> List[League]:
+        """Leagues whose name or country name contains query (case-insensitive)"""
+        query_cf = query.casefold()
+        if not query_cf:
+            return list(self.leagues)
+        if self.SEPARATOR in query_cf:
+            return []
+        
+        rows = set()
+        self._find_rows(self._names, query_cf, rows)
+        self._find_rows(self._country_names, query_cf, rows)
+        return [self.leagues[row] for row in sorted(rows)]
+    
+    def filter_by_type(self, league_type: str) -> List[League]:
+        """Leagues of the given type (case-insensitive)"""
+        type_cf = league_type.casefold()
+        return [league for league, league_type_cf in zip(self.leagues, self.types_cf) if league_type_cf == type_cf]
+
+
+@dataclass(slots=True)
 class LeagueResponse:
     """Lightweight response wrapper for leagues API"""
     leagues: List[League]
     total_count: int
     current_page: int
     total_pages: int
+    # Lookup indexes, built on first use; underscored so orjson leaves them out of responses
+    _by_id: Optional[Dict[int, League]] = field(default=None, init=False, repr=False, compare=False)
+    _by_country: Optional[Dict[str, List[League]]] = field(default=None, init=False, repr=False, compare=False)
+    _table: Optional[LeagueTable] = field(default=None, init=False, repr=False, compare=False)
     
     @classmethod
     def from_api_data(cls, api_response: Dict[str, Any]) -> 'LeagueResponse':
@@ -150,11 +281,79 @@ class LeagueResponse:
             total_pages=paging_data.get('total', 1)
         )
     
+    def get_league(self, league_id: int) -> Optional[League]:
+        """Get a league by ID in O(1) after the first lookup"""
+        if self._by_id is None:
+            by_id = {}
+            for league in self.leagues:
+                by_id.setdefault(league.id, league)  # First match wins, as with a linear scan
+            self._by_id = by_id
+        return self._by_id.get(league_id)
+    
+    def leagues_by_country(self, country_code: str) -> List[League]:
+        """Get the leagues for a country code in O(1) after the first lookup"""
+        if self._by_country is None:
+            by_country = {}
+            for league in self.leagues:
+                by_country.setdefault(league.country.code, []).append(league)
+            self._by_country = by_country
+        return list(self._by_country.get(country_code, ()))
+    
+    def table(self) -> LeagueTable:
+        """Get the column-oriented view of the leagues, built on first use"""
+        if self._table is None:
+            self._table = LeagueTable(self.leagues)
+        return self._table
+    
     def to_summary_response(self) -> Dict[str, Any]:
         """Convert to ultra-lightweight summary response"""
+        # Build the summary dicts directly rather than via LeagueSummary.__dict__
+        leagues_out = []
+        for league in self.leagues:
+            current_season = league.current_season()
+            leagues_out.append({
+                'id': league.id,
+                'name': league.name,
+                'country_name': league.country.name,
+                'country_code': league.country.code,
+                'logo_url': league.logo_url,
+                'current_season_year': current_season.year if current_season else None
+            })
+        
         return {
-            'leagues': [LeagueSummary.from_league(league).__dict__ for league in self.leagues],
+            'leagues': leagues_out,
             'total_count': self.total_count,
             'current_page': self.current_page,
             'total_pages': self.total_pages
         }
+    
+    @classmethod
+    def api_to_summary_response(cls, api_response: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the summary response straight from API Football data, without the model objects"""
+        leagues_out = []
+        for league_data in api_response.get('response', []):
+            league_info = league_data.get('league', {})
+            country_info = league_data.get('country', {})
+            
+            current_year = None
+            for season in league_data.get('seasons', []):
+                if season.get('current', False):
+                    current_year = season.get('year', 0)
+                    break
+            
+            leagues_out.append({
+                'id': league_info.get('id', 0),
+                'name': league_info.get('name', ''),
+                'country_name': country_info.get('name', ''),
+                'country_code': country_info.get('code', ''),
+                'logo_url': league_info.get('logo', ''),
+                'current_season_year': current_year
+            })
+        
+        paging_data = api_response.get('paging', {})
+        return {
+            'leagues': leagues_out,
+            'total_count': api_response.get('results', 0),
+            'current_page': paging_data.get('current', 1),
+            'total_pages': paging_data.get('total', 1)
+        }
@@ -1,15 +1,31 @@
+import os
 import requests
 import logging
 import time
+import threading
+import orjson
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from config import Config
 from utils.logging_config import get_logger
-from middleware.request_logger import log_external_api_call
+from middleware.request_logger import log_external_api_call, log_cache_operation
+from middleware.rate_limiter import UpstreamRateLimiter
 
 # Get specialized logger
 logger = get_logger('api_client')
 
+# Maximum concurrent in-flight requests to API Football per process
+MAX_CONCURRENT_REQUESTS = int(os.getenv('API_FOOTBALL_MAX_CONCURRENCY', '32'))
+
+# Keep-alive connections held open to the upstream host per process
+HTTP_POOL_SIZE = int(os.getenv('API_FOOTBALL_POOL_SIZE', '50'))
+
+# Bytes of response bodies remembered with their ETag/Last-Modified for conditional re-fetches
+VALIDATOR_CACHE_MAX_BYTES = int(os.getenv('API_FOOTBALL_VALIDATOR_CACHE_BYTES', str(16 * 1024 * 1024)))
+
+
 class APIFootballClient:
     """Client for interacting with API Football service"""
     
@@ -23,9 +39,23 @@ class APIFootballClient:
         self.session = requests.Session()
         self.session.headers.update(self.headers)
         
+        # Size the keep-alive pool for concurrent workers; retries stay with tenacity
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Bursts queue here instead of piling onto the upstream host; the cap
+        # adapts to upstream rate limit responses
+        self.upstream_limiter = UpstreamRateLimiter(MAX_CONCURRENT_REQUESTS)
+        
+        # (endpoint, params) -> (etag, last_modified, body), least recently used first
+        self._validators = OrderedDict()
+        self._validators_bytes = 0
+        self._validators_lock = threading.Lock()
+        
         # Log client initialization
-        logger.info(f"API Football client initialized - Base URL: {self.base_url}")
-        logger.debug(f"Headers configured: {list(self.headers.keys())}")
+        logger.info("API Football client initialized - Base URL: %s", self.base_url)
+        logger.debug("Headers configured: %s", list(self.headers.keys()))
     
     @retry(
         stop=stop_after_attempt(Config.MAX_RETRIES),
@@ -37,30 +67,64 @@ class APIFootballClient:
     def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make HTTP request to API Football with retry logic and comprehensive logging"""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Log request start
-        logger.info(f"API_REQUEST_START - Endpoint: {endpoint} - URL: {url} - Params: {params}")
+        logger.info("API_REQUEST_START - Endpoint: %s - URL: %s - Params: %s", endpoint, url, params)
+        
+        # Revalidate a previously seen response instead of downloading it again
+        cache_key = (endpoint, frozenset((params or {}).items()))
+        cached = self._get_validators(cache_key)
+        conditional_headers = None
+        if cached is not None:
+            etag, last_modified, _ = cached
+            conditional_headers = {}
+            if etag:
+                conditional_headers['If-None-Match'] = etag
+            if last_modified:
+                conditional_headers['If-Modified-Since'] = last_modified
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+            with self.upstream_limiter:
+                response, body = self._get(url, params, conditional_headers)
+                if response.status_code == 304 and cached is None:
+                    # Nothing stored to answer a 304 with: fetch the full body instead
+                    response, body = self._get(url, params, None)
+            self.upstream_limiter.record_response(response.status_code, response.headers)
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to milliseconds
             
             # Log response details
             logger.info(
-                f"API_RESPONSE - Endpoint: {endpoint} - Status: {response.status_code} - "
-                f"Time: {response_time:.2f}ms - Size: {len(response.content)} bytes"
+                "API_RESPONSE - Endpoint: %s - Status: %s - Time: %.2fms - Size: %s bytes",
+                endpoint, response.status_code, response_time, len(body)
             )
             
-            response.raise_for_status()
-            
-            data = response.json()
+            not_modified = response.status_code == 304
+            if not_modified:
+                if cached is None:
+                    raise requests.exceptions.HTTPError(
+                        "304 Not Modified for an unconditional request", response=response
+                    )
+                body = cached[2]
+            else:
+                response.raise_for_status()
+            
+            # Decode the raw bytes directly, skipping requests' charset detection
+            data = orjson.loads(body)
             response_count = len(data.get('response', []))
             
+            if cached is not None:
+                log_cache_operation('conditional_get', endpoint, hit=not_modified)
+            if not not_modified:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    self._store_validators(cache_key, etag, last_modified, body)
+            
             # Log successful response
             logger.info(
-                f"API_SUCCESS - Endpoint: {endpoint} - Items: {response_count} - "
-                f"Time: {response_time:.2f}ms"
+                "API_SUCCESS - Endpoint: %s - Items: %s - Time: %.2fms",
+                endpoint, response_count, response_time
             )
             
             # Log external API call for request tracking
@@ -75,13 +139,13 @@ class APIFootballClient:
             
             return data
             
-        except requests.exceptions.HTTPError as e:
-            response_time = (time.time() - start_time) * 1000
-            status_code = e.response.status_code if e.response else 0
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+            status_code = getattr(getattr(e, 'response', None), 'status_code', 0)
             
             logger.error(
-                f"API_HTTP_ERROR - Endpoint: {endpoint} - Status: {status_code} - "
-                f"Time: {response_time:.2f}ms - Error: {str(e)}"
+                "API_REQUEST_ERROR - Endpoint: %s - Status: %s - Time: %.2fms - Error: %s - Type: %s",
+                endpoint, status_code, response_time, e, type(e).__name__
             )
             
             # Log external API call with error
@@ -91,139 +155,92 @@ class APIFootballClient:
                 method='GET',
                 params=params,
                 response_time=response_time,
-                status_code=status_code,
-                error=str(e)
-            )
-            
-            raise
-            
-        except requests.exceptions.ConnectionError as e:
-            response_time = (time.time() - start_time) * 1000
-            
-            logger.error(
-                f"API_CONNECTION_ERROR - Endpoint: {endpoint} - Time: {response_time:.2f}ms - "
-                f"Error: {str(e)}"
-            )
-            
-            log_external_api_call(
-                api_name='API Football',
-                endpoint=endpoint,
-                method='GET',
-                params=params,
-                response_time=response_time,
-                error=str(e)
-            )
-            
-            raise
-            
-        except requests.exceptions.Timeout as e:
-            response_time = (time.time() - start_time) * 1000
-            
-            logger.error(
-                f"API_TIMEOUT_ERROR - Endpoint: {endpoint} - Time: {response_time:.2f}ms - "
-                f"Error: {str(e)}"
-            )
-            
-            log_external_api_call(
-                api_name='API Football',
-                endpoint=endpoint,
-                method='GET',
-                params=params,
-                response_time=response_time,
-                error=str(e)
-            )
-            
-            raise
-            
-        except requests.exceptions.RequestException as e:
-            response_time = (time.time() - start_time) * 1000
-            
-            logger.error(
-                f"API_REQUEST_ERROR - Endpoint: {endpoint} - Time: {response_time:.2f}ms - "
-                f"Error: {str(e)}"
-            )
-            
-            log_external_api_call(
-                api_name='API Football',
-                endpoint=endpoint,
-                method='GET',
-                params=params,
-                response_time=response_time,
-                error=str(e)
-            )
-            
-            raise
-            
-        except Exception as e:
-            response_time = (time.time() - start_time) * 1000
-            
-            logger.error(
-                f"API_UNEXPECTED_ERROR - Endpoint: {endpoint} - Time: {response_time:.2f}ms - "
-                f"Error: {str(e)} - Type: {type(e).__name__}"
-            )
-            
-            log_external_api_call(
-                api_name='API Football',
-                endpoint=endpoint,
-                method='GET',
-                params=params,
-                response_time=response_time,
+                status_code=status_code or None,
                 error=str(e)
             )
             
             raise
     
+    def _get(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> tuple:
+        """GET url and return (response, body bytes)"""
+        response = self.session.get(url, params=params, headers=headers, timeout=30, stream=True)
+        # Read the body straight off the connection, skipping requests' chunked buffering
+        return response, response.raw.read(decode_content=True)
+    
+    def _get_validators(self, cache_key: tuple) -> Optional[tuple]:
+        """Return (etag, last_modified, body) remembered for a request, if any"""
+        with self._validators_lock:
+            entry = self._validators.get(cache_key)
+            if entry is not None:
+                self._validators.move_to_end(cache_key)
+            return entry
+    
+    def _store_validators(self, cache_key: tuple, etag: Optional[str], last_modified: Optional[str],
+                          body: bytes) -> None:
+        """Remember a response body and its validators, evicting least recently used entries past the byte budget"""
+        with self._validators_lock:
+            previous = self._validators.pop(cache_key, None)
+            if previous is not None:
+                self._validators_bytes -= len(previous[2])
+            if len(body) > VALIDATOR_CACHE_MAX_BYTES:
+                return  # Too large to keep; always fetched in full
+            self._validators[cache_key] = (etag, last_modified, body)
+            self._validators_bytes += len(body)
+            while self._validators_bytes > VALIDATOR_CACHE_MAX_BYTES:
+                _, (_, _, evicted_body) = self._validators.popitem(last=False)
+                self._validators_bytes -= len(evicted_body)
+    
     def get_leagues(self, **kwargs) -> Dict[str, Any]:
         """Get leagues data"""
-        logger.debug(f"Getting leagues data with params: {kwargs}")
+        logger.debug("Getting leagues data with params: %s", kwargs)
         return self._make_request('leagues', params=kwargs)
     
     def get_teams(self, **kwargs) -> Dict[str, Any]:
         """Get teams data"""
-        logger.debug(f"Getting teams data with params: {kwargs}")
+        logger.debug("Getting teams data with params: %s", kwargs)
         return self._make_request('teams', params=kwargs)
     
     def get_fixtures(self, **kwargs) -> Dict[str, Any]:
         """Get fixtures data"""
-        logger.debug(f"Getting fixtures data with params: {kwargs}")
+        logger.debug("Getting fixtures data with params: %s", kwargs)
         return self._make_request('fixtures', params=kwargs)
     
     def get_players(self, **kwargs) -> Dict[str, Any]:
         """Get players data"""
-        logger.debug(f"Getting players data with params: {kwargs}")
+        logger.debug("Getting players data with params: %s", kwargs)
         return self._make_request('players', params=kwargs)
     
     def get_standings(self, **kwargs) -> Dict[str, Any]:
         """Get standings data"""
-        logger.debug(f"Getting standings data with params: {kwargs}")
+        logger.debug("Getting standings data with params: %s", kwargs)
         return self._make_request('standings', params=kwargs)
     
     def get_countries(self, **kwargs) -> Dict[str, Any]:
         """Get countries data"""
-        logger.debug(f"Getting countries data with params: {kwargs}")
+        logger.debug("Getting countries data with params: %s", kwargs)
         return self._make_request('countries', params=kwargs)
     
     def get_seasons(self, **kwargs) -> Dict[str, Any]:
         """Get seasons data"""
-        logger.debug(f"Getting seasons data with params: {kwargs}")
+        logger.debug("Getting seasons data with params: %s", kwargs)
         return self._make_request('seasons', params=kwargs)
     
     def get_venues(self, **kwargs) -> Dict[str, Any]:
         """Get venues data"""
-        logger.debug(f"Getting venues data with params: {kwargs}")
+        logger.debug("Getting venues data with params: %s", kwargs)
         return self._make_request('venues', params=kwargs)
     
     def get_odds(self, **kwargs) -> Dict[str, Any]:
         """Get odds data"""
-        logger.debug(f"Getting odds data with params: {kwargs}")
+        logger.debug("Getting odds data with params: %s", kwargs)
         return self._make_request('odds', params=kwargs)
     
     def get_predictions(self, **kwargs) -> Dict[str, Any]:
         """Get predictions data"""
-        logger.debug(f"Getting predictions data with params: {kwargs}")
+        logger.debug("Getting predictions data with params: %s", kwargs)
         return self._make_request('predictions', params=kwargs)
     
     def get_custom_endpoint(self, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Get data from any custom endpoint"""
-        logger.debug(f"Getting custom endpoint '{endpoint}' data with params: {kwargs}")
+        logger.debug("Getting custom endpoint '%s' data with params: %s", endpoint, kwargs)
         return self._make_request(endpoint, params=kwargs)
@@ -2,7 +2,7 @@
 Service layer for league data transformation and business logic
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from models.league_models import LeagueResponse, League, LeagueSummary
 from utils.logging_config import get_logger
 
@@ -25,20 +25,24 @@ class LeagueService:
     def get_league_summaries(api_response: Dict[str, Any]) -> Dict[str, Any]:
         """Get ultra-lightweight league summaries for list views"""
         try:
-            league_response = LeagueService.transform_api_response(api_response)
-            return league_response.to_summary_response()
+            # Summaries need none of the model objects, so build the dicts in one pass
+            return LeagueResponse.api_to_summary_response(api_response)
         except Exception as e:
             logger.error(f"Error creating league summaries: {e}")
             raise ValueError(f"Failed to create league summaries: {str(e)}")
     
     @staticmethod
-    def filter_leagues_by_country(leagues: List[League], country_code: str) -> List[League]:
-        """Filter leagues by country code"""
+    def filter_leagues_by_country(leagues: Union[LeagueResponse, List[League]], country_code: str) -> List[League]:
+        """Filter leagues by country code, using the response's index when given one"""
+        if isinstance(leagues, LeagueResponse):
+            return leagues.leagues_by_country(country_code)
         return [league for league in leagues if league.country.code == country_code]
     
     @staticmethod
-    def filter_leagues_by_type(leagues: List[League], league_type: str) -> List[League]:
+    def filter_leagues_by_type(leagues: Union[LeagueResponse, List[League]], league_type: str) -> List[League]:
         """Filter leagues by type (League, Cup, etc.)"""
+        if isinstance(leagues, LeagueResponse):
+            return leagues.table().filter_by_type(league_type)
         return [league for league in leagues if league.type.lower() == league_type.lower()]
     
     @staticmethod
@@ -62,15 +66,19 @@ class LeagueService:
         return filtered_leagues
     
     @staticmethod
-    def search_leagues(leagues: List[League], query: str) -> List[League]:
-        """Search leagues by name or country name"""
-        query_lower = query.lower()
+    def search_leagues(leagues: Union[LeagueResponse, List[League]], query: str) -> List[League]:
+        """Search leagues by name or country name (case-insensitive)"""
+        if isinstance(leagues, LeagueResponse):
+            return leagues.table().search(query)
+        query_cf = query.casefold()
         return [
             league for league in leagues 
-            if query_lower in league.name.lower() or query_lower in league.country.name.lower()
+            if query_cf in league._name_cf or query_cf in league.country._name_cf
         ]
     
     @staticmethod
-    def get_league_by_id(leagues: List[League], league_id: int) -> Optional[League]:
-        """Get a specific league by ID"""
+    def get_league_by_id(leagues: Union[LeagueResponse, List[League]], league_id: int) -> Optional[League]:
+        """Get a specific league by ID, using the response's index when given one"""
+        if isinstance(leagues, LeagueResponse):
+            return leagues.get_league(league_id)
         return next((league for league in leagues if league.id == league_id), None)
@@ -1,7 +1,41 @@
 import os
 import logging
+import threading
+import orjson
 from config import Config
-from utils.logging_config import setup_logging, get_logger
+from utils.logging_config import setup_logging, get_logger, colorize_level_names
+
+
+# Third-party loggers quietened per environment, resolved to logger objects once at import
+_NOISY_LOGGER_LEVELS = {
+    env: tuple((logging.getLogger(name), level) for name, level in levels)
+    for env, levels in {
+        'development': (),
+        'production': (
+            ('urllib3', logging.WARNING),
+            ('requests', logging.WARNING),
+            ('werkzeug', logging.ERROR),
+            ('schedule', logging.WARNING)
+        ),
+        'testing': (
+            ('urllib3', logging.ERROR),
+            ('requests', logging.ERROR),
+            ('werkzeug', logging.ERROR),
+            ('schedule', logging.ERROR)
+        ),
+        'staging': (
+            ('urllib3', logging.WARNING),
+            ('requests', logging.WARNING),
+            ('werkzeug', logging.WARNING)
+        )
+    }.items()
+}
+
+
+def _quiet_noisy_loggers(env):
+    """Apply the third-party logger levels for an environment"""
+    for logger, level in _NOISY_LOGGER_LEVELS[env]:
+        logger.setLevel(level)
 
 
 class EnvironmentLoggingConfig:
@@ -16,8 +50,9 @@ class EnvironmentLoggingConfig:
         Config.LOG_FILE_MAX_BYTES = '500000'  # 500KB files for easier testing
         Config.LOG_FILE_BACKUP_COUNT = '5'  # Fewer backups in development
         
-        # Setup logging
-        setup_logging()
+        # Setup logging, replacing any earlier configuration with the overrides above
+        setup_logging(force=True)
+        _quiet_noisy_loggers('development')
         
         # Get development logger
         dev_logger = get_logger('development')
@@ -35,14 +70,11 @@ class EnvironmentLoggingConfig:
         Config.LOG_FILE_BACKUP_COUNT = '30'  # 30 days of logs
         Config.LOG_RETENTION_DAYS = 90  # Keep logs for 90 days
         
-        # Setup logging
-        setup_logging()
+        # Setup logging, replacing any earlier configuration with the overrides above
+        setup_logging(force=True)
         
         # Suppress noisy loggers in production
-        logging.getLogger('urllib3').setLevel(logging.WARNING)
-        logging.getLogger('requests').setLevel(logging.WARNING)
-        logging.getLogger('werkzeug').setLevel(logging.ERROR)
-        logging.getLogger('schedule').setLevel(logging.WARNING)
+        _quiet_noisy_loggers('production')
         
         # Get production logger
         prod_logger = get_logger('production')
@@ -60,14 +92,11 @@ class EnvironmentLoggingConfig:
         Config.LOG_FILE_BACKUP_COUNT = '2'  # Minimal backups
         Config.LOG_RETENTION_DAYS = 1  # Keep logs for 1 day only
         
-        # Setup logging
-        setup_logging()
+        # Setup logging, replacing any earlier configuration with the overrides above
+        setup_logging(force=True)
         
         # Suppress most loggers in testing
-        logging.getLogger('urllib3').setLevel(logging.ERROR)
-        logging.getLogger('requests').setLevel(logging.ERROR)
-        logging.getLogger('werkzeug').setLevel(logging.ERROR)
-        logging.getLogger('schedule').setLevel(logging.ERROR)
+        _quiet_noisy_loggers('testing')
         
         # Get testing logger
         test_logger = get_logger('testing')
@@ -85,13 +114,11 @@ class EnvironmentLoggingConfig:
         Config.LOG_FILE_BACKUP_COUNT = '14'  # 2 weeks of logs
         Config.LOG_RETENTION_DAYS = 30  # Keep logs for 30 days
         
-        # Setup logging
-        setup_logging()
+        # Setup logging, replacing any earlier configuration with the overrides above
+        setup_logging(force=True)
         
         # Moderate logging for staging
-        logging.getLogger('urllib3').setLevel(logging.WARNING)
-        logging.getLogger('requests').setLevel(logging.WARNING)
-        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        _quiet_noisy_loggers('staging')
         
         # Get staging logger
         staging_logger = get_logger('staging')
@@ -100,26 +127,41 @@ class EnvironmentLoggingConfig:
         return staging_logger
 
 
+# Setup function per environment; unknown environments fall back to development
+_ENVIRONMENT_SETUPS = {
+    'development': EnvironmentLoggingConfig.setup_development_logging,
+    'production': EnvironmentLoggingConfig.setup_production_logging,
+    'testing': EnvironmentLoggingConfig.setup_testing_logging,
+    'staging': EnvironmentLoggingConfig.setup_staging_logging
+}
+
+
 def setup_environment_logging():
     """Setup logging based on current environment"""
-    env = Config.FLASK_ENV.lower()
-    
-    if env == 'development':
-        return EnvironmentLoggingConfig.setup_development_logging()
-    elif env == 'production':
-        return EnvironmentLoggingConfig.setup_production_logging()
-    elif env == 'testing':
-        return EnvironmentLoggingConfig.setup_testing_logging()
-    elif env == 'staging':
-        return EnvironmentLoggingConfig.setup_staging_logging()
-    else:
-        # Default to development if environment is not recognized
-        return EnvironmentLoggingConfig.setup_development_logging()
+    setup = _ENVIRONMENT_SETUPS.get(
+        Config.FLASK_ENV.lower(),
+        EnvironmentLoggingConfig.setup_development_logging
+    )
+    reset_env_logger_cache()
+    return setup()
+
+
+# Logger for Config.FLASK_ENV, resolved on first use
+_env_logger = None
+
+
+def reset_env_logger_cache():
+    """Forget the cached environment logger, e.g. after Config.FLASK_ENV changes"""
+    global _env_logger
+    _env_logger = None
 
 
 def get_environment_logger():
     """Get a logger configured for the current environment"""
-    return get_logger(Config.FLASK_ENV.lower())
+    global _env_logger
+    if _env_logger is None:
+        _env_logger = get_logger(Config.FLASK_ENV.lower())
+    return _env_logger
 
 
 # Environment-specific log formatters
@@ -135,50 +177,65 @@ class DevelopmentFormatter(logging.Formatter):
         'RESET': '\033[0m'        # Reset
     }
     
+    # Color-wrapped level names, built once
+    COLORED_LEVELS = colorize_level_names(COLORS)
+    
     def format(self, record):
-        # Add color to level name
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
+        # Color the level name and prefix the request ID for this formatter only,
+        # restoring the record so other handlers see the original values
+        levelname = record.levelname
+        msg = record.msg
+        record.levelname = self.COLORED_LEVELS.get(levelname, levelname)
         
         # Add extra development info
         if hasattr(record, 'request_id'):
-            record.msg = f"[{record.request_id}] {record.msg}"
+            record.msg = f"[{record.request_id}] {msg}"
         
-        return super().format(record)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+            record.msg = msg
+
+
+# Per-thread scratch dict reused by ProductionFormatter between records
+_format_state = threading.local()
 
 
 class ProductionFormatter(logging.Formatter):
     """Production formatter with structured output"""
     
+    # Request context attributes copied into the entry when present on the record
+    CONTEXT_KEYS = ('request_id', 'endpoint', 'method', 'status_code', 'response_time')
+    
     def format(self, record):
-        # Create structured log entry
-        log_entry = {
-            'timestamp': self.formatTime(record),
-            'level': record.levelname,
-            'logger': record.name,
-            'message': record.getMessage(),
-            'module': record.module,
-            'function': record.funcName,
-            'line': record.lineno
-        }
+        # Create structured log entry in a reused dict; it is serialized before returning
+        log_entry = getattr(_format_state, 'log_entry', None)
+        if log_entry is None:
+            log_entry = _format_state.log_entry = {}
+        else:
+            log_entry.clear()
+        
+        log_entry['timestamp'] = self.formatTime(record)
+        log_entry['level'] = record.levelname
+        log_entry['logger'] = record.name
+        log_entry['message'] = record.getMessage()
+        log_entry['module'] = record.module
+        log_entry['function'] = record.funcName
+        log_entry['line'] = record.lineno
         
         # Add request context if available
-        if hasattr(record, 'request_id'):
-            log_entry['request_id'] = record.request_id
-        if hasattr(record, 'endpoint'):
-            log_entry['endpoint'] = record.endpoint
-        if hasattr(record, 'method'):
-            log_entry['method'] = record.method
-        if hasattr(record, 'status_code'):
-            log_entry['status_code'] = record.status_code
-        if hasattr(record, 'response_time'):
-            log_entry['response_time'] = record.response_time
+        record_attrs = record.__dict__
+        for key in self.CONTEXT_KEYS:
+            if key in record_attrs:
+                log_entry[key] = record_attrs[key]
         
         # Add exception info if present
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
         
-        return str(log_entry)
+        # Emit real JSON; the handler appends the line terminator
+        return orjson.dumps(log_entry, default=str).decode()
 
 
 class TestingFormatter(logging.Formatter):
@@ -234,11 +291,22 @@ ENVIRONMENT_LOG_LEVELS = {
 }
 
 
+# (logger, numeric level) pairs per environment, resolved once at import time
+_ENVIRONMENT_LOGGER_LEVELS = {
+    env: tuple(
+        (logging.getLogger(logger_name), getattr(logging, level.upper()))
+        for logger_name, level in levels.items()
+    )
+    for env, levels in ENVIRONMENT_LOG_LEVELS.items()
+}
+
+
 def configure_environment_loggers():
     """Configure logger levels based on environment"""
-    env = Config.FLASK_ENV.lower()
-    levels = ENVIRONMENT_LOG_LEVELS.get(env, ENVIRONMENT_LOG_LEVELS['development'])
+    logger_levels = _ENVIRONMENT_LOGGER_LEVELS.get(
+        Config.FLASK_ENV.lower(),
+        _ENVIRONMENT_LOGGER_LEVELS['development']
+    )
     
-    for logger_name, level in levels.items():
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(getattr(logging, level.upper()))
+    for logger, level in logger_levels:
+        logger.setLevel(level)
@@ -1,5 +1,4 @@
 import logging
-import traceback
 from flask import jsonify, request, g
 from werkzeug.exceptions import HTTPException
 import requests
@@ -18,12 +17,23 @@ class APIError(Exception):
         self.error_code = error_code
         super().__init__(self.message)
 
+def _log_context(request_id: str, status_code: int) -> dict:
+    """Request fields attached to error records for structured formatters"""
+    return {
+        'request_id': request_id,
+        'method': request.method,
+        'endpoint': request.path,
+        'status_code': status_code
+    }
+
+def _client_addr():
+    """Client address bound by bind_request_context, read from the request if it never ran"""
+    return g.get('remote_addr') or request.remote_addr
+
 def create_error_response(message: str, status_code: int, error_code: str = None, details: dict = None) -> tuple:
     """Create standardized error response with enhanced context"""
     # Get request context
     request_id = getattr(g, 'request_id', 'unknown')
-    user_agent = request.headers.get('User-Agent', 'Unknown')
-    remote_addr = request.remote_addr
     
     error_data = {
         'error': {
@@ -41,11 +51,13 @@ def create_error_response(message: str, status_code: int, error_code: str = None
         error_data['error']['details'] = details
     
     # Log error with context
-    logger.error(
-        f"ERROR_RESPONSE - ID: {request_id} - {request.method} {request.path} - "
-        f"Status: {status_code} - Code: {error_code} - Message: {message} - "
-        f"IP: {remote_addr} - UA: {user_agent[:100]}"
-    )
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            "ERROR_RESPONSE - ID: %s - %s %s - Status: %s - Code: %s - Message: %s - IP: %s - UA: %.100s",
+            request_id, request.method, request.path, status_code, error_code, message,
+            _client_addr(), g.get('user_agent', 'Unknown'),
+            extra=_log_context(request_id, status_code)
+        )
     
     return jsonify(error_data), status_code
 
@@ -53,26 +65,33 @@ def handle_http_error(error: HTTPException) -> tuple:
     """Handle HTTP exceptions with enhanced logging"""
     request_id = getattr(g, 'request_id', 'unknown')
     
-    # Log with context
+    # Log with context; expected client errors don't need a traceback
     logger.warning(
-        f"HTTP_ERROR - ID: {request_id} - {request.method} {request.path} - "
-        f"Code: {error.code} - Description: {error.description} - "
-        f"IP: {request.remote_addr}"
+        "HTTP_ERROR - ID: %s - %s %s - Code: %s - Description: %s - IP: %s",
+        request_id, request.method, request.path, error.code, error.description, _client_addr()
     )
     
     # Log security events for certain error codes
-    if error.code in [401, 403, 429]:
+    if error.code in [401, 403, 429] and security_logger.isEnabledFor(logging.WARNING):
         log_security_event(
             f"HTTP_{error.code}",
-            f"Path: {request.path}, IP: {request.remote_addr}, UA: {request.headers.get('User-Agent', 'Unknown')[:100]}",
+            "Path: %s, IP: %s, UA: %.100s",
+            request.path, _client_addr(), g.get('user_agent', 'Unknown'),
             severity='WARNING'
         )
     
-    return create_error_response(
+    response, status_code = create_error_response(
         message=error.description,
         status_code=error.code,
         error_code=f'HTTP_{error.code}'
     )
+    
+    # Keep protocol headers such as Allow on 405 responses
+    for header, value in error.get_headers():
+        if header != 'Content-Type':
+            response.headers[header] = value
+    
+    return response, status_code
 
 def handle_api_error(error: APIError) -> tuple:
     """Handle custom API errors with enhanced logging"""
@@ -80,16 +99,18 @@ def handle_api_error(error: APIError) -> tuple:
     
     # Log with full context
     logger.error(
-        f"API_ERROR - ID: {request_id} - {request.method} {request.path} - "
-        f"Status: {error.status_code} - Code: {error.error_code} - Message: {error.message} - "
-        f"IP: {request.remote_addr}"
+        "API_ERROR - ID: %s - %s %s - Status: %s - Code: %s - Message: %s - IP: %s",
+        request_id, request.method, request.path, error.status_code, error.error_code,
+        error.message, _client_addr(),
+        extra=_log_context(request_id, error.status_code)
     )
     
     # Log as security event if it's an authentication/authorization error
-    if error.status_code in [401, 403]:
+    if error.status_code in [401, 403] and security_logger.isEnabledFor(logging.WARNING):
         log_security_event(
             f"API_{error.error_code}",
-            f"Path: {request.path}, IP: {request.remote_addr}, Error: {error.message}",
+            "Path: %s, IP: %s, Error: %s",
+            request.path, _client_addr(), error.message,
             severity='WARNING'
         )
     
@@ -99,105 +120,107 @@ def handle_api_error(error: APIError) -> tuple:
         error_code=error.error_code
     )
 
-def handle_requests_error(error: requests.exceptions.RequestException) -> tuple:
-    """Handle requests library errors with enhanced logging"""
-    request_id = getattr(g, 'request_id', 'unknown')
+def _handle_connection_error(error: requests.exceptions.ConnectionError, request_id: str) -> tuple:
+    """API Football could not be reached"""
+    logger.error(
+        "CONNECTION_ERROR - ID: %s - API Football connection failed - Error: %s - IP: %s",
+        request_id, error, _client_addr()
+    )
+    return create_error_response(
+        message="Unable to connect to API Football service",
+        status_code=503,
+        error_code='SERVICE_UNAVAILABLE',
+        details={'service': 'api-football'}
+    )
+
+def _handle_timeout_error(error: requests.exceptions.Timeout, request_id: str) -> tuple:
+    """API Football did not answer in time"""
+    logger.error(
+        "TIMEOUT_ERROR - ID: %s - API Football request timed out - Error: %s - IP: %s",
+        request_id, error, _client_addr()
+    )
+    return create_error_response(
+        message="Request to API Football timed out",
+        status_code=504,
+        error_code='GATEWAY_TIMEOUT',
+        details={'service': 'api-football'}
+    )
+
+# API Football statuses passed through to the client as (message, error_code)
+_UPSTREAM_STATUS_RESPONSES = {
+    401: ("Invalid API key for API Football", 'UNAUTHORIZED'),
+    403: ("Access forbidden - check API key permissions", 'FORBIDDEN'),
+    429: ("Rate limit exceeded for API Football", 'RATE_LIMIT_EXCEEDED'),
+    404: ("Resource not found in API Football", 'NOT_FOUND')
+}
+
+def _handle_upstream_http_error(error: requests.exceptions.HTTPError, request_id: str) -> tuple:
+    """API Football answered with an error status"""
+    status_code = error.response.status_code if error.response is not None else 500
+    logger.error(
+        "API_HTTP_ERROR - ID: %s - API Football returned %s - Error: %s - IP: %s",
+        request_id, status_code, error, _client_addr()
+    )
     
-    if isinstance(error, requests.exceptions.ConnectionError):
-        logger.error(
-            f"CONNECTION_ERROR - ID: {request_id} - API Football connection failed - "
-            f"Error: {str(error)} - IP: {request.remote_addr}"
-        )
-        return create_error_response(
-            message="Unable to connect to API Football service",
-            status_code=503,
-            error_code='SERVICE_UNAVAILABLE',
-            details={'service': 'api-football'}
+    # Log security events for authentication/authorization errors
+    if status_code in (401, 403, 429) and security_logger.isEnabledFor(logging.WARNING):
+        log_security_event(
+            f"API_FOOTBALL_{status_code}",
+            "Status: %s, Error: %s, IP: %s",
+            status_code, error, _client_addr(),
+            severity='WARNING'
         )
     
-    elif isinstance(error, requests.exceptions.Timeout):
-        logger.error(
-            f"TIMEOUT_ERROR - ID: {request_id} - API Football request timed out - "
-            f"Error: {str(error)} - IP: {request.remote_addr}"
-        )
+    # Map API Football errors to appropriate responses
+    mapped = _UPSTREAM_STATUS_RESPONSES.get(status_code)
+    if mapped is not None:
+        message, error_code = mapped
         return create_error_response(
-            message="Request to API Football timed out",
-            status_code=504,
-            error_code='GATEWAY_TIMEOUT',
+            message=message,
+            status_code=status_code,
+            error_code=error_code,
             details={'service': 'api-football'}
         )
+    return create_error_response(
+        message=f"API Football returned error: {status_code}",
+        status_code=502,
+        error_code='BAD_GATEWAY',
+        details={'service': 'api-football', 'original_status': status_code}
+    )
+
+# Checked in order, so ConnectTimeout (both a ConnectionError and a Timeout) stays a connection error
+_REQUESTS_ERROR_HANDLERS = {
+    requests.exceptions.ConnectionError: _handle_connection_error,
+    requests.exceptions.Timeout: _handle_timeout_error,
+    requests.exceptions.HTTPError: _handle_upstream_http_error
+}
+
+def handle_requests_error(error: requests.exceptions.RequestException) -> tuple:
+    """Handle requests library errors with enhanced logging"""
+    request_id = getattr(g, 'request_id', 'unknown')
     
-    elif isinstance(error, requests.exceptions.HTTPError):
-        status_code = error.response.status_code if error.response else 500
-        logger.error(
-            f"API_HTTP_ERROR - ID: {request_id} - API Football returned {status_code} - "
-            f"Error: {str(error)} - IP: {request.remote_addr}"
-        )
-        
-        # Log security events for authentication/authorization errors
-        if status_code in [401, 403, 429]:
-            log_security_event(
-                f"API_FOOTBALL_{status_code}",
-                f"Status: {status_code}, Error: {str(error)}, IP: {request.remote_addr}",
-                severity='WARNING'
-            )
-        
-        # Map API Football errors to appropriate responses
-        if status_code == 401:
-            return create_error_response(
-                message="Invalid API key for API Football",
-                status_code=401,
-                error_code='UNAUTHORIZED',
-                details={'service': 'api-football'}
-            )
-        elif status_code == 403:
-            return create_error_response(
-                message="Access forbidden - check API key permissions",
-                status_code=403,
-                error_code='FORBIDDEN',
-                details={'service': 'api-football'}
-            )
-        elif status_code == 429:
-            return create_error_response(
-                message="Rate limit exceeded for API Football",
-                status_code=429,
-                error_code='RATE_LIMIT_EXCEEDED',
-                details={'service': 'api-football'}
-            )
-        elif status_code == 404:
-            return create_error_response(
-                message="Resource not found in API Football",
-                status_code=404,
-                error_code='NOT_FOUND',
-                details={'service': 'api-football'}
-            )
-        else:
-            return create_error_response(
-                message=f"API Football returned error: {status_code}",
-                status_code=502,
-                error_code='BAD_GATEWAY',
-                details={'service': 'api-football', 'original_status': status_code}
-            )
+    for error_class, handler in _REQUESTS_ERROR_HANDLERS.items():
+        if isinstance(error, error_class):
+            return handler(error, request_id)
     
-    else:
-        logger.error(
-            f"UNEXPECTED_REQUESTS_ERROR - ID: {request_id} - Unexpected API Football error - "
-            f"Error: {str(error)} - Type: {type(error).__name__} - IP: {request.remote_addr}"
-        )
-        return create_error_response(
-            message="Unexpected error communicating with API Football",
-            status_code=502,
-            error_code='BAD_GATEWAY',
-            details={'service': 'api-football'}
-        )
+    logger.error(
+        "UNEXPECTED_REQUESTS_ERROR - ID: %s - Unexpected API Football error - Error: %s - Type: %s - IP: %s",
+        request_id, error, type(error).__name__, _client_addr()
+    )
+    return create_error_response(
+        message="Unexpected error communicating with API Football",
+        status_code=502,
+        error_code='BAD_GATEWAY',
+        details={'service': 'api-football'}
+    )
 
 def handle_validation_error(error: ValueError) -> tuple:
     """Handle validation errors with enhanced logging"""
     request_id = getattr(g, 'request_id', 'unknown')
     
     logger.warning(
-        f"VALIDATION_ERROR - ID: {request_id} - {request.method} {request.path} - "
-        f"Error: {str(error)} - IP: {request.remote_addr}"
+        "VALIDATION_ERROR - ID: %s - %s %s - Error: %s - IP: %s",
+        request_id, request.method, request.path, error, _client_addr()
     )
     
     return create_error_response(
@@ -210,20 +233,19 @@ def handle_generic_error(error: Exception) -> tuple:
     """Handle unexpected errors with comprehensive logging"""
     request_id = getattr(g, 'request_id', 'unknown')
     
-    # Log the error with full context
+    # Log the error with full context and traceback
     logger.error(
-        f"UNEXPECTED_ERROR - ID: {request_id} - {request.method} {request.path} - "
-        f"Error: {str(error)} - Type: {type(error).__name__} - IP: {request.remote_addr}"
+        "UNEXPECTED_ERROR - ID: %s - %s %s - Error: %s - Type: %s - IP: %s",
+        request_id, request.method, request.path, error, type(error).__name__, _client_addr(),
+        exc_info=error, extra=_log_context(request_id, 500)
     )
     
-    # Log the full traceback
-    logger.error(f"TRACEBACK - ID: {request_id} - {traceback.format_exc()}")
-    
     # Log as security event for critical errors
     if isinstance(error, (MemoryError, SystemError, KeyboardInterrupt)):
         log_security_event(
             f"CRITICAL_ERROR_{type(error).__name__}",
-            f"Error: {str(error)}, IP: {request.remote_addr}, Path: {request.path}",
+            "Error: %s, IP: %s, Path: %s",
+            error, _client_addr(), request.path,
             severity='CRITICAL'
         )
     
@@ -298,6 +320,7 @@ def register_error_handlers(app):
     app.errorhandler(APIError)(handle_api_error)
     app.errorhandler(requests.exceptions.RequestException)(handle_requests_error)
     app.errorhandler(ValueError)(handle_validation_error)
+    app.errorhandler(HTTPException)(handle_http_error)  # Codes without a dedicated handler above
     app.errorhandler(Exception)(handle_generic_error)
     
     logger.info("Enhanced error handlers registered successfully with comprehensive logging")
@@ -1,11 +1,29 @@
 import os
 import gzip
+import fnmatch
+import contextlib
 import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from config import Config
-from utils.logging_config import get_logger
+from utils.logging_config import setup_logging, get_logger
+
+# Rotated logs are cold storage: favour compression speed over ratio and copy in large chunks
+COMPRESS_LEVEL = 1
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+COMPRESS_WORKERS = min(4, os.cpu_count() or 1)
+# Below this size the gzip header and per-file work outweigh any space saved
+COMPRESS_MIN_BYTES = 4 * 1024
+
+# Log file categories for stats, matched by filename prefix; anything else is 'other'
+LOG_TYPE_PREFIXES = (
+    ('app.log', 'application'),
+    ('access.log', 'access'),
+    ('error.log', 'error')
+)
+LOG_FILE_TYPES = ('application', 'access', 'error', 'other')
 
 
 class LogManager:
@@ -18,113 +36,184 @@ class LogManager:
         self.max_file_size = int(Config.LOG_FILE_MAX_BYTES)
         self.backup_count = int(Config.LOG_FILE_BACKUP_COUNT)
     
-    def compress_old_logs(self):
+    def _scan(self):
+        """Snapshot (path, size, mtime) for every log file, with one stat per file"""
+        snapshot = []
+        with os.scandir(self.logs_dir) as entries:
+            for entry in entries:
+                if not fnmatch.fnmatchcase(entry.name, '*.log*'):
+                    continue
+                try:
+                    file_stat = entry.stat()
+                except OSError as e:
+                    self.logger.error(f"Failed to stat {entry.path}: {e}")
+                    continue
+                snapshot.append((entry.path, file_stat.st_size, file_stat.st_mtime))
+        return snapshot
+    
+    def _compress_one(self, log_file, compressed_file=None):
+        """Gzip a single rotated log, returning its (path, size, mtime) entry or None on failure"""
+        if compressed_file is None:
+            compressed_file = f"{log_file}.gz"
+        temp_file = f"{compressed_file}.tmp"
+        try:
+            # Compress into a temp file and rename it, so a crash never leaves a truncated .gz
+            with open(log_file, 'rb') as f_in:
+                with gzip.open(temp_file, 'wb', compresslevel=COMPRESS_LEVEL) as f_out:
+                    shutil.copyfileobj(f_in, f_out, COMPRESS_CHUNK_SIZE)
+            os.replace(temp_file, compressed_file)
+            
+            # Remove original file
+            os.unlink(log_file)
+            file_stat = os.stat(compressed_file)
+            self.logger.debug(f"Compressed: {log_file}")
+            return compressed_file, file_stat.st_size, file_stat.st_mtime
+            
+        except Exception as e:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_file)
+            self.logger.error(f"Failed to compress {log_file}: {e}")
+            return None
+    
+    def compress_old_logs(self, snapshot=None):
         """Compress log files older than 1 day"""
         self.logger.info("Starting log compression...")
+        if snapshot is None:
+            snapshot = self._scan()
+        
+        # Modification times of everything on disk, to tell a leftover original
+        # from a new file that RotatingFileHandler shifted into the same name
+        mtimes = {log_file: file_mtime for log_file, _, file_mtime in snapshot}
+        
+        candidates = []
+        targets = []
+        for index, (log_file, file_size, file_mtime) in enumerate(snapshot):
+            name = os.path.basename(log_file)
+            if not fnmatch.fnmatchcase(name, '*.log.*') or name.endswith(('.gz', '.gz.tmp')):
+                continue
+            if file_size < COMPRESS_MIN_BYTES:
+                continue
+            
+            compressed_file = f"{log_file}.gz"
+            archive_mtime = mtimes.get(compressed_file)
+            if archive_mtime is not None:
+                if archive_mtime >= file_mtime:
+                    # Already compressed; the original survived an interrupted run
+                    continue
+                # Newer contents under a reused name: keep the old archive alongside
+                suffix = datetime.fromtimestamp(file_mtime).strftime("%Y%m%d_%H%M%S")
+                compressed_file = f"{log_file}.{suffix}.gz"
+            candidates.append(index)
+            targets.append(compressed_file)
         
+        # zlib and file I/O release the GIL, so several files compress in parallel
         compressed_count = 0
-        for log_file in self.logs_dir.glob("*.log.*"):
-            if not log_file.name.endswith('.gz'):
-                try:
-                    # Compress the file
-                    with open(log_file, 'rb') as f_in:
-                        with gzip.open(f"{log_file}.gz", 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
-                    
-                    # Remove original file
-                    log_file.unlink()
-                    compressed_count += 1
-                    self.logger.debug(f"Compressed: {log_file}")
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to compress {log_file}: {e}")
+        if candidates:
+            max_workers = min(COMPRESS_WORKERS, len(candidates))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(self._compress_one, [snapshot[index][0] for index in candidates], targets)
+                for index, entry in zip(candidates, results):
+                    if entry is not None:
+                        # Record the archive in place of the original
+                        snapshot[index] = entry
+                        compressed_count += 1
         
         self.logger.info(f"Log compression completed. Compressed {compressed_count} files.")
         return compressed_count
     
-    def cleanup_old_logs(self):
+    def cleanup_old_logs(self, snapshot=None):
         """Remove log files older than retention period"""
         self.logger.info(f"Starting log cleanup (retention: {self.retention_days} days)...")
+        if snapshot is None:
+            snapshot = self._scan()
         
-        cutoff_date = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_timestamp = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
         removed_count = 0
+        remaining = []
         
-        for log_file in self.logs_dir.glob("*.log*"):
+        for log_file, file_size, file_mtime in snapshot:
             try:
-                # Get file modification time
-                file_mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-                
-                if file_mtime < cutoff_date:
-                    log_file.unlink()
+                if file_mtime < cutoff_timestamp:
+                    os.unlink(log_file)
                     removed_count += 1
                     self.logger.debug(f"Removed old log: {log_file}")
+                    continue
                     
             except Exception as e:
                 self.logger.error(f"Failed to remove {log_file}: {e}")
+            remaining.append((log_file, file_size, file_mtime))
         
+        snapshot[:] = remaining
         self.logger.info(f"Log cleanup completed. Removed {removed_count} files.")
         return removed_count
     
-    def get_log_stats(self):
+    def get_log_stats(self, snapshot=None):
         """Get statistics about log files"""
+        if snapshot is None:
+            snapshot = self._scan()
+        
         stats = {
             'total_files': 0,
             'total_size': 0,
-            'files_by_type': {},
+            'files_by_type': {file_type: {'count': 0, 'size': 0} for file_type in LOG_FILE_TYPES},
             'oldest_file': None,
             'newest_file': None
         }
         
-        for log_file in self.logs_dir.glob("*.log*"):
+        # Track extremes as raw epoch floats and convert once at the end
+        oldest_mtime = None
+        newest_mtime = None
+        
+        for log_file, file_size, file_mtime in snapshot:
             try:
-                file_size = log_file.stat().st_size
-                file_mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-                
                 stats['total_files'] += 1
                 stats['total_size'] += file_size
                 
                 # Categorize by file type
-                if log_file.name.startswith('app.log'):
-                    file_type = 'application'
-                elif log_file.name.startswith('access.log'):
-                    file_type = 'access'
-                elif log_file.name.startswith('error.log'):
-                    file_type = 'error'
-                else:
-                    file_type = 'other'
-                
-                if file_type not in stats['files_by_type']:
-                    stats['files_by_type'][file_type] = {'count': 0, 'size': 0}
+                name = os.path.basename(log_file)
+                file_type = next(
+                    (file_type for prefix, file_type in LOG_TYPE_PREFIXES if name.startswith(prefix)),
+                    'other'
+                )
                 
-                stats['files_by_type'][file_type]['count'] += 1
-                stats['files_by_type'][file_type]['size'] += file_size
+                type_stats = stats['files_by_type'][file_type]
+                type_stats['count'] += 1
+                type_stats['size'] += file_size
                 
                 # Track oldest and newest files
-                if stats['oldest_file'] is None or file_mtime < stats['oldest_file']:
-                    stats['oldest_file'] = file_mtime
-                if stats['newest_file'] is None or file_mtime > stats['newest_file']:
-                    stats['newest_file'] = file_mtime
+                if oldest_mtime is None or file_mtime < oldest_mtime:
+                    oldest_mtime = file_mtime
+                if newest_mtime is None or file_mtime > newest_mtime:
+                    newest_mtime = file_mtime
                     
             except Exception as e:
                 self.logger.error(f"Failed to get stats for {log_file}: {e}")
         
+        if oldest_mtime is not None:
+            stats['oldest_file'] = datetime.fromtimestamp(oldest_mtime)
+            stats['newest_file'] = datetime.fromtimestamp(newest_mtime)
+        
         return stats
     
     def rotate_logs(self):
         """Manually rotate current log files"""
         self.logger.info("Starting manual log rotation...")
         
+        with os.scandir(self.logs_dir) as entries:
+            log_files = [entry.path for entry in entries if fnmatch.fnmatchcase(entry.name, '*.log')]
+        
+        # One timestamp per rotation so a batch of backups shares the same suffix
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
         rotated_count = 0
-        for log_file in self.logs_dir.glob("*.log"):
-            if not log_file.name.endswith('.log.1'):
+        for log_file in log_files:
+            if not log_file.endswith('.log.1'):
                 try:
                     # Create backup name with timestamp
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    backup_name = f"{log_file.stem}_{timestamp}.log"
-                    backup_path = log_file.parent / backup_name
+                    backup_path = f"{log_file[:-len('.log')]}_{timestamp}.log"
                     
-                    # Move current log to backup
-                    shutil.move(str(log_file), str(backup_path))
+                    # Move current log to backup (same directory, so a plain rename)
+                    os.replace(log_file, backup_path)
                     rotated_count += 1
                     self.logger.info(f"Rotated: {log_file} -> {backup_path}")
                     
@@ -134,21 +223,27 @@ class LogManager:
         self.logger.info(f"Manual log rotation completed. Rotated {rotated_count} files.")
         return rotated_count
     
-    def cleanup_empty_logs(self):
+    def cleanup_empty_logs(self, snapshot=None):
         """Remove empty log files"""
         self.logger.info("Starting cleanup of empty log files...")
+        if snapshot is None:
+            snapshot = self._scan()
         
         removed_count = 0
-        for log_file in self.logs_dir.glob("*.log*"):
+        remaining = []
+        for log_file, file_size, file_mtime in snapshot:
             try:
-                if log_file.stat().st_size == 0:
-                    log_file.unlink()
+                if file_size == 0:
+                    os.unlink(log_file)
                     removed_count += 1
                     self.logger.debug(f"Removed empty file: {log_file}")
+                    continue
                     
             except Exception as e:
                 self.logger.error(f"Failed to remove empty file {log_file}: {e}")
+            remaining.append((log_file, file_size, file_mtime))
         
+        snapshot[:] = remaining
         self.logger.info(f"Empty log cleanup completed. Removed {removed_count} files.")
         return removed_count
     
@@ -159,17 +254,20 @@ class LogManager:
         # Ensure logs directory exists
         self.logs_dir.mkdir(exist_ok=True)
         
+        # Scan the directory once; each task updates the snapshot as it changes files
+        snapshot = self._scan()
+        
         # Get initial stats
-        initial_stats = self.get_log_stats()
+        initial_stats = self.get_log_stats(snapshot)
         self.logger.info(f"Initial log stats: {initial_stats}")
         
         # Run maintenance tasks
-        compressed = self.compress_old_logs()
-        removed = self.cleanup_old_logs()
-        empty_removed = self.cleanup_empty_logs()
+        compressed = self.compress_old_logs(snapshot)
+        removed = self.cleanup_old_logs(snapshot)
+        empty_removed = self.cleanup_empty_logs(snapshot)
         
         # Get final stats
-        final_stats = self.get_log_stats()
+        final_stats = self.get_log_stats(snapshot)
         
         # Log summary
         self.logger.info(
@@ -236,42 +334,43 @@ def setup_log_rotation_schedule():
 
 
 # CLI interface for log management
+def _print_stats(log_manager):
+    """Print log file statistics"""
+    stats = log_manager.get_log_stats()
+    print(f"Log Statistics:")
+    print(f"  Total files: {stats['total_files']}")
+    print(f"  Total size: {log_manager._format_size(stats['total_size'])}")
+    print(f"  Files by type: {stats['files_by_type']}")
+    print(f"  Oldest file: {stats['oldest_file']}")
+    print(f"  Newest file: {stats['newest_file']}")
+
+
+CLI_COMMANDS = {
+    'compress': lambda log_manager: print(f"Compressed {log_manager.compress_old_logs()} log files"),
+    'cleanup': lambda log_manager: print(f"Removed {log_manager.cleanup_old_logs()} old log files"),
+    'rotate': lambda log_manager: print(f"Rotated {log_manager.rotate_logs()} log files"),
+    'stats': _print_stats,
+    'maintenance': lambda log_manager: print(f"Maintenance completed: {log_manager.run_maintenance()}")
+}
+
+# Commands that log what they change; stats only prints, so it skips logging setup
+LOGGING_COMMANDS = {'compress', 'cleanup', 'rotate', 'maintenance'}
+
+
 if __name__ == "__main__":
     import sys
     
-    log_manager = LogManager()
-    
     if len(sys.argv) < 2:
-        print("Usage: python log_manager.py [compress|cleanup|rotate|stats|maintenance]")
+        print(f"Usage: python log_manager.py [{'|'.join(CLI_COMMANDS)}]")
         sys.exit(1)
     
+    # Validate the command before constructing the manager
     command = sys.argv[1].lower()
-    
-    if command == "compress":
-        count = log_manager.compress_old_logs()
-        print(f"Compressed {count} log files")
-    
-    elif command == "cleanup":
-        count = log_manager.cleanup_old_logs()
-        print(f"Removed {count} old log files")
-    
-    elif command == "rotate":
-        count = log_manager.rotate_logs()
-        print(f"Rotated {count} log files")
-    
-    elif command == "stats":
-        stats = log_manager.get_log_stats()
-        print(f"Log Statistics:")
-        print(f"  Total files: {stats['total_files']}")
-        print(f"  Total size: {log_manager._format_size(stats['total_size'])}")
-        print(f"  Files by type: {stats['files_by_type']}")
-        print(f"  Oldest file: {stats['oldest_file']}")
-        print(f"  Newest file: {stats['newest_file']}")
-    
-    elif command == "maintenance":
-        result = log_manager.run_maintenance()
-        print(f"Maintenance completed: {result}")
-    
-    else:
+    run_command = CLI_COMMANDS.get(command)
+    if run_command is None:
         print(f"Unknown command: {command}")
         sys.exit(1)
+    
+    if command in LOGGING_COMMANDS:
+        setup_logging()
+    run_command(LogManager())
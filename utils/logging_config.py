@@ -1,10 +1,26 @@
 import os
+import sys
+import queue
+import atexit
+import threading
 import logging
 import logging.handlers
 from datetime import datetime
+try:
+    import fcntl
+except ImportError:  # Windows: rotation between processes is left unsynchronized
+    fcntl = None
+import orjson
 from config import Config
 
 
+def colorize_level_names(colors):
+    """Map each level name in a COLORS table to its color-wrapped form"""
+    return {
+        name: f"{code}{name}{colors['RESET']}" for name, code in colors.items() if name != 'RESET'
+    }
+
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for console output"""
     
@@ -18,23 +34,34 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'        # Reset
     }
     
+    # Color-wrapped level names, built once
+    COLORED_LEVELS = colorize_level_names(COLORS)
+    
     def format(self, record):
-        # Add color to the level name
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
-        
-        return super().format(record)
+        # Add color to the level name for this formatter only, so file handlers
+        # formatting the same record afterwards don't get escape codes
+        levelname = record.levelname
+        record.levelname = self.COLORED_LEVELS.get(levelname, levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
 
 
 class StructuredFormatter(logging.Formatter):
-    """Structured formatter for JSON-like output"""
+    """Structured formatter for JSON output"""
+    
+    # Extra attributes copied into the entry when present on the record
+    EXTRA_KEYS = ('request_id', 'user_id', 'endpoint', 'method', 'status_code', 'response_time')
     
     def format(self, record):
         log_entry = {
-            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            # orjson renders the datetime as ISO 8601 itself
+            'timestamp': datetime.fromtimestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
-            'message': record.getMessage(),
+            # Messages without arguments need no %-formatting
+            'message': record.getMessage() if record.args else str(record.msg),
             'module': record.module,
             'function': record.funcName,
             'line': record.lineno
@@ -45,31 +72,349 @@ class StructuredFormatter(logging.Formatter):
             log_entry['exception'] = self.formatException(record.exc_info)
         
         # Add extra fields if present
-        if hasattr(record, 'request_id'):
-            log_entry['request_id'] = record.request_id
-        if hasattr(record, 'user_id'):
-            log_entry['user_id'] = record.user_id
-        if hasattr(record, 'endpoint'):
-            log_entry['endpoint'] = record.endpoint
-        if hasattr(record, 'method'):
-            log_entry['method'] = record.method
-        if hasattr(record, 'status_code'):
-            log_entry['status_code'] = record.status_code
-        if hasattr(record, 'response_time'):
-            log_entry['response_time'] = record.response_time
+        record_attrs = record.__dict__
+        for key in self.EXTRA_KEYS:
+            if key in record_attrs:
+                log_entry[key] = record_attrs[key]
+        
+        # Emit real JSON rather than a Python dict repr
+        return orjson.dumps(log_entry, default=str).decode()
+
+
+class BatchingMemoryHandler(logging.handlers.MemoryHandler):
+    """
+    MemoryHandler that writes a buffered batch to its target with a single flush
+    
+    A plain MemoryHandler replays records through target.handle(), and stream
+    handlers flush after every record, so batching saves no syscalls. For stream
+    targets this writes all formatted records first and flushes once. A timer
+    armed by the first buffered record flushes the batch within flush_interval
+    seconds, even if no further records arrive.
+    """
+    
+    def __init__(self, capacity, flushLevel=logging.ERROR, target=None,
+                 flushOnClose=True, flush_interval=1.0):
+        super().__init__(capacity, flushLevel=flushLevel, target=target, flushOnClose=flushOnClose)
+        self.flush_interval = flush_interval
+        self._flush_timer = None
+    
+    def emit(self, record):
+        super().emit(record)
+        if self.buffer:
+            self._arm_flush_timer()
+    
+    def _arm_flush_timer(self):
+        """Start the flush timer unless one is already pending (called with the lock held)"""
+        timer = self._flush_timer
+        # A timer inherited across fork() reports not alive, so the child arms its own
+        if timer is None or not timer.is_alive():
+            timer = threading.Timer(self.flush_interval, self.flush)
+            timer.daemon = True
+            self._flush_timer = timer
+            timer.start()
+    
+    def close(self):
+        timer = self._flush_timer
+        if timer is not None:
+            timer.cancel()
+        super().close()
+    
+    def flush(self):
+        self.acquire()
+        try:
+            target = self.target
+            if target is None or not self.buffer:
+                return
+            if isinstance(target, logging.StreamHandler):
+                self._write_batch(target)
+            else:
+                for record in self.buffer:
+                    if record.levelno >= target.level:
+                        target.handle(record)
+                target.flush()
+            self.buffer.clear()
+        finally:
+            self.release()
+    
+    def _write_batch(self, target):
+        target.acquire()
+        try:
+            for record in self.buffer:
+                if record.levelno < target.level or not target.filter(record):
+                    continue
+                try:
+                    if (isinstance(target, logging.handlers.BaseRotatingHandler)
+                            and target.shouldRollover(record)):
+                        target.doRollover()
+                    if target.stream is None:
+                        target.stream = target._open()
+                    target.stream.write(target.format(record) + target.terminator)
+                except Exception:
+                    target.handleError(record)
+            if target.stream is not None:
+                target.stream.flush()
+        finally:
+            target.release()
+
+
+class FastAppendHandler(logging.Handler):
+    """
+    Size-rotated log file written with os.writev on an O_APPEND descriptor
+    
+    Records are encoded once and collected as bytes; up to capacity of them go
+    to the kernel in a single writev() call, skipping the text and buffered I/O
+    layers of FileHandler. O_APPEND keeps appends from several worker processes
+    whole without locking. Rotation is serialized between processes with flock,
+    and each batch reopens the file if another worker (or logrotate) has moved
+    it. flush() writes whatever is pending.
+    """
+    
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding='utf-8', capacity=64):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.encoding = encoding
+        self.capacity = capacity
+        self._pending = []
+        self._fd = self._open()
+    
+    def _open(self):
+        return os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    
+    def emit(self, record):
+        try:
+            self._pending.append((self.format(record) + '\n').encode(self.encoding))
+            if len(self._pending) >= self.capacity:
+                self._write_pending()
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_pending()
+        finally:
+            self.release()
+    
+    def _write_pending(self):
+        pending = self._pending
+        if not pending:
+            return
+        if self._fd is None:
+            self._fd = self._open()
+        elif not self._is_current():
+            # Rotated by another process: follow the new file instead of the backup
+            self._reopen()
+        
+        total = sum(map(len, pending))
+        written = os.writev(self._fd, pending) if hasattr(os, 'writev') else 0
+        if written < total:
+            # Partial (or no) vectored write: finish with plain writes
+            remaining = b''.join(pending)[written:]
+            while remaining:
+                remaining = remaining[os.write(self._fd, remaining):]
+        pending.clear()
         
-        return str(log_entry)
+        if self.maxBytes > 0 and os.fstat(self._fd).st_size >= self.maxBytes:
+            self._rollover()
+    
+    def _is_current(self):
+        """Whether the open descriptor still refers to the file at baseFilename"""
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(self._fd)
+        return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+    
+    def _reopen(self):
+        os.close(self._fd)
+        self._fd = None
+        self._fd = self._open()
+    
+    def _rollover(self):
+        """
+        Shift name.N-1 -> name.N, ..., name -> name.1, then reopen, like RotatingFileHandler
+        
+        Workers share the file, so the shift runs under an exclusive flock on the
+        log directory, and only if the file is still the live one and still over
+        the limit; a worker that lost the race just reopens the new file.
+        """
+        dir_fd = os.open(os.path.dirname(self.baseFilename), os.O_RDONLY)
+        try:
+            if fcntl is not None:
+                fcntl.flock(dir_fd, fcntl.LOCK_EX)
+            if self._is_current() and os.fstat(self._fd).st_size >= self.maxBytes:
+                if self.backupCount > 0:
+                    for i in range(self.backupCount - 1, 0, -1):
+                        source = f"{self.baseFilename}.{i}"
+                        if os.path.exists(source):
+                            os.replace(source, f"{self.baseFilename}.{i + 1}")
+                    os.replace(self.baseFilename, f"{self.baseFilename}.1")
+                else:
+                    os.truncate(self.baseFilename, 0)
+        finally:
+            os.close(dir_fd)  # Releases the lock
+        self._reopen()
+    
+    def close(self):
+        self.acquire()
+        try:
+            try:
+                self._write_pending()
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+        finally:
+            self.release()
+        super().close()
+
+
+class MaxLevelFilter(logging.Filter):
+    """Pass only records below a level, e.g. to keep errors out of a general log"""
+    
+    def __init__(self, level):
+        super().__init__()
+        self.level = level
+    
+    def filter(self, record):
+        return record.levelno < self.level
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted for its own QueueListener
+    
+    The stock prepare() formats the message on the calling thread so records can
+    be pickled. Records here never leave the process, so formatting is left to
+    the listener thread and the caller only pays for the enqueue. The listener
+    starts with the first record each process emits, so a worker forked after
+    setup_logging() (gunicorn --preload) runs its own thread instead of queueing
+    to one fork() did not copy. Once the listener is stopped, records are
+    handed to the handlers on the calling thread.
+    """
+    
+    def __init__(self, handlers):
+        super().__init__(queue.SimpleQueue())
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._listener_pid = None
+        self._stopped = False
+    
+    def prepare(self, record):
+        return record
+    
+    def enqueue(self, record):
+        # Runs under the handler lock, so only one thread starts the listener
+        if self._stopped:
+            self.listener.handle(record)
+            return
+        if self._listener_pid != os.getpid():
+            self._start_listener()
+        self.queue.put_nowait(record)
+    
+    def _start_listener(self):
+        if self._listener_pid is not None:
+            # Forked from a process whose listener was running: leave its queue
+            # behind and serve the same handlers from a fresh one
+            self.queue = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(
+                self.queue, *self.listener.handlers, respect_handler_level=True
+            )
+        self.listener.start()
+        self._listener_pid = os.getpid()
+    
+    def stop_listener(self):
+        """Drain and stop the listener if this process started it; later records are written in-line"""
+        self.acquire()
+        try:
+            # Set under the handler lock, so nothing is enqueued after the listener's last drain
+            self._stopped = True
+            if self._listener_pid == os.getpid():
+                self.listener.stop()
+        finally:
+            self.release()
+
+
+def _skip_find_caller(stack_info=False, stacklevel=1):
+    """Logger.findCaller stand-in for loggers whose format never shows the call site"""
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+# Set once handlers are installed, so repeated setup_logging() calls are no-ops
+_setup_done = False
+
+# Queue handlers installed by setup_logging, each with its background listener
+_queue_handlers = []
+
+
+def _attach_queue_listener(logger, handlers):
+    """Serve handlers from a background QueueListener so logger's callers only enqueue"""
+    queue_handler = DeferredQueueHandler(handlers)
+    logger.addHandler(queue_handler)
+    _queue_handlers.append(queue_handler)
+
+
+def _stop_listeners():
+    """Drain and stop the background listeners, closing the handlers they served"""
+    while _queue_handlers:
+        queue_handler = _queue_handlers.pop()
+        queue_handler.stop_listener()
+        for handler in queue_handler.listener.handlers:
+            handler.close()
+
+
+def _drop_inherited_records():
+    """In a forked child, discard records the parent had buffered; the parent writes those itself"""
+    for queue_handler in _queue_handlers:
+        for handler in queue_handler.listener.handlers:
+            if isinstance(handler, BatchingMemoryHandler):
+                handler.buffer.clear()
+                handler = handler.target
+            if isinstance(handler, FastAppendHandler):
+                handler._pending.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_drop_inherited_records)
+
+
+def _stop_listeners_at_exit():
+    """Drain the background listeners, leaving the handlers to serve records logged later in shutdown"""
+    for queue_handler in _queue_handlers:
+        queue_handler.stop_listener()
+
+
+# Runs before logging's own shutdown hook, which then flushes and closes the handlers
+atexit.register(_stop_listeners_at_exit)
 
 
-def setup_logging():
-    """Setup comprehensive logging configuration"""
+def setup_logging(force=False):
+    """Setup comprehensive logging configuration, once per process unless force is set"""
+    global _setup_done
+    if _setup_done and not force:
+        return logging.getLogger()
+    _setup_done = True
+    _stop_listeners()
+    
+    # No formatter shows thread or process details, so don't collect them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     
     # Create logs directory if it doesn't exist
     os.makedirs(Config.LOGS_DIR, exist_ok=True)
     
+    # Settings read once; the environment setups override Config just before calling this
+    log_level = getattr(logging, Config.LOG_LEVEL.upper())
+    max_bytes = int(Config.LOG_FILE_MAX_BYTES)
+    backup_count = int(Config.LOG_FILE_BACKUP_COUNT)
+    encoding = Config.LOG_FILE_ENCODING
+    
     # Get root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper()))
+    root_logger.setLevel(log_level)
     
     # Clear any existing handlers
     root_logger.handlers.clear()
@@ -85,13 +430,21 @@ def setup_logging():
         datefmt=Config.LOG_DATE_FORMAT
     )
     
-    structured_formatter = StructuredFormatter()
+    # Access records always come from the request hooks, so the call site adds nothing
+    access_formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt=Config.LOG_DATE_FORMAT
+    )
     
-    # Console handler (always present)
+    # Console handler (always present); written in-line when debugging for immediate feedback
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.DEBUG if Config.FLASK_DEBUG else logging.INFO)
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    if Config.FLASK_DEBUG:
+        root_logger.addHandler(console_handler)
+        root_handlers = []
+    else:
+        root_handlers = [console_handler]
     
     # File handler with rotation
     log_file_path = os.path.join(Config.LOGS_DIR, Config.LOG_FILE)
@@ -101,49 +454,73 @@ def setup_logging():
             log_file_path,
             when='midnight',
             interval=1,
-            backupCount=int(Config.LOG_FILE_BACKUP_COUNT),
-            encoding=Config.LOG_FILE_ENCODING
+            backupCount=backup_count,
+            encoding=encoding
         )
     else:  # size-based rotation
         file_handler = logging.handlers.RotatingFileHandler(
             log_file_path,
-            maxBytes=int(Config.LOG_FILE_MAX_BYTES),
-            backupCount=int(Config.LOG_FILE_BACKUP_COUNT),
-            encoding=Config.LOG_FILE_ENCODING
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding=encoding
         )
     
-    file_handler.setLevel(getattr(logging, Config.LOG_LEVEL.upper()))
+    file_handler.setLevel(log_level)
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    
+    # Coalesce app.log writes into one write+flush per batch
+    buffered_file_handler = BatchingMemoryHandler(
+        capacity=256,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    # ERROR and above are written once, to error.log only
+    buffered_file_handler.addFilter(MaxLevelFilter(logging.ERROR))
+    root_handlers.append(buffered_file_handler)
     
     # Error file handler (separate file for errors)
     error_log_path = os.path.join(Config.LOGS_DIR, 'error.log')
     error_handler = logging.handlers.RotatingFileHandler(
         error_log_path,
-        maxBytes=int(Config.LOG_FILE_MAX_BYTES),
-        backupCount=int(Config.LOG_FILE_BACKUP_COUNT),
-        encoding=Config.LOG_FILE_ENCODING
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding=encoding
     )
-    error_handler.setLevel(logging.ERROR)
+    error_handler.setLevel(logging.ERROR)  # Left unbuffered so errors are on disk immediately
     error_handler.setFormatter(file_formatter)
-    root_logger.addHandler(error_handler)
+    root_handlers.append(error_handler)
     
     # Access log handler (for HTTP requests)
     access_log_path = os.path.join(Config.LOGS_DIR, 'access.log')
-    access_handler = logging.handlers.RotatingFileHandler(
+    access_handler = FastAppendHandler(
         access_log_path,
-        maxBytes=int(Config.LOG_FILE_MAX_BYTES),
-        backupCount=int(Config.LOG_FILE_BACKUP_COUNT),
-        encoding=Config.LOG_FILE_ENCODING
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding=encoding
     )
     access_handler.setLevel(logging.INFO)
-    access_handler.setFormatter(file_formatter)
+    access_handler.setFormatter(access_formatter)
+    
+    # Buffer access log writes so a burst of requests costs one write
+    buffered_access_handler = BatchingMemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=access_handler,
+        flushOnClose=True
+    )
     
     # Create access logger
     access_logger = logging.getLogger('access')
     access_logger.setLevel(logging.INFO)
-    access_logger.addHandler(access_handler)
+    access_logger.handlers.clear()  # A forced re-setup replaces the handler instead of adding another
     access_logger.propagate = False  # Don't propagate to root logger
+    access_logger.findCaller = _skip_find_caller  # Skip the per-record stack walk
+    
+    # Format and write on background listeners so logging threads only enqueue.
+    # access does not propagate, so it gets its own listener to keep records routed as before
+    _attach_queue_listener(root_logger, root_handlers)
+    _attach_queue_listener(access_logger, [buffered_access_handler])
     
     # Configure specific loggers
     configure_loggers()
@@ -151,33 +528,27 @@ def setup_logging():
     return root_logger
 
 
+# Component and third-party logger levels applied by configure_loggers
+_LOGGER_LEVELS = (
+    ('app', logging.INFO),             # Flask app logger
+    ('api_client', logging.INFO),      # API client logger
+    ('cache', logging.INFO),           # Cache logger
+    ('rate_limiter', logging.INFO),    # Rate limiter logger
+    ('error_handler', logging.ERROR),  # Error handler logger
+    # Suppress some noisy loggers
+    ('urllib3', logging.WARNING),
+    ('requests', logging.WARNING),
+    ('werkzeug', logging.WARNING)
+)
+
+
 def configure_loggers():
     """Configure specific loggers for different components"""
-    
-    # Flask app logger
-    app_logger = logging.getLogger('app')
-    app_logger.setLevel(logging.INFO)
-    
-    # API client logger
-    api_logger = logging.getLogger('api_client')
-    api_logger.setLevel(logging.INFO)
-    
-    # Cache logger
-    cache_logger = logging.getLogger('cache')
-    cache_logger.setLevel(logging.INFO)
-    
-    # Rate limiter logger
-    rate_limiter_logger = logging.getLogger('rate_limiter')
-    rate_limiter_logger.setLevel(logging.INFO)
-    
-    # Error handler logger
-    error_logger = logging.getLogger('error_handler')
-    error_logger.setLevel(logging.ERROR)
-    
-    # Suppress some noisy loggers
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('requests').setLevel(logging.WARNING)
-    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    for name, level in _LOGGER_LEVELS:
+        component_logger = logging.getLogger(name)
+        # setLevel clears every logger's level cache, so skip it when nothing changes
+        if component_logger.level != level:
+            component_logger.setLevel(level)
 
 
 def get_logger(name):
@@ -185,82 +556,96 @@ def get_logger(name):
     return logging.getLogger(name)
 
 
+# Component loggers for the helpers below, looked up once instead of per call
+_access_logger = logging.getLogger('access')
+_api_logger = logging.getLogger('api_client')
+_cache_logger = logging.getLogger('cache')
+_error_logger = logging.getLogger('error_handler')
+
+
 def log_request(request, response=None, response_time=None):
     """Log HTTP request details"""
-    access_logger = logging.getLogger('access')
+    if not _access_logger.isEnabledFor(logging.INFO):
+        return
     
     # Extract request details
     method = request.method
     path = request.path
     remote_addr = request.remote_addr
-    user_agent = request.headers.get('User-Agent', 'Unknown')
-    content_type = request.headers.get('Content-Type', '')
     
     # Extract response details if available
     status_code = response.status_code if response else None
     
-    # Create log message
-    log_data = {
-        'method': method,
-        'path': path,
-        'remote_addr': remote_addr,
-        'user_agent': user_agent,
-        'content_type': content_type,
-        'status_code': status_code,
-        'response_time': response_time
-    }
-    
     # Log the request
-    access_logger.info(f"Request: {method} {path} - {remote_addr} - {status_code} - {response_time}ms")
+    _access_logger.info(
+        "Request: %s %s - %s - %s - %sms",
+        method, path, remote_addr, status_code, response_time
+    )
+
+
+# log_api_call format per combination of optional fields, indexed by a bitmask
+# of (params, response_time, status_code, error)
+_API_CALL_OPTIONAL_FMTS = (" - Params: %s", " - Time: %sms", " - Status: %s", " - Error: %s")
+_API_CALL_FMTS = tuple(
+    "API Call: %s %s" + "".join(
+        part for bit, part in enumerate(_API_CALL_OPTIONAL_FMTS) if mask & (1 << bit)
+    )
+    for mask in range(1 << len(_API_CALL_OPTIONAL_FMTS))
+)
 
 
 def log_api_call(endpoint, method, params=None, response_time=None, status_code=None, error=None):
     """Log API client calls"""
-    api_logger = logging.getLogger('api_client')
-    
-    log_message = f"API Call: {method} {endpoint}"
-    
-    if params:
-        log_message += f" - Params: {params}"
-    if response_time:
-        log_message += f" - Time: {response_time}ms"
-    if status_code:
-        log_message += f" - Status: {status_code}"
-    if error:
-        log_message += f" - Error: {error}"
-    
+    # Pick the level first so nothing is formatted when it would be dropped
     if error or (status_code and status_code >= 400):
-        api_logger.error(log_message)
+        log_level = logging.ERROR
     else:
-        api_logger.info(log_message)
+        log_level = logging.INFO
+    if not _api_logger.isEnabledFor(log_level):
+        return
+    
+    # Formatting is left to the logging framework
+    mask = 0
+    log_args = [method, endpoint]
+    for bit, value in enumerate((params, response_time, status_code, error)):
+        if value:
+            mask |= 1 << bit
+            log_args.append(value)
+    
+    _api_logger.log(log_level, _API_CALL_FMTS[mask], *log_args)
 
 
 def log_cache_operation(operation, key, hit=None, ttl=None):
     """Log cache operations"""
-    cache_logger = logging.getLogger('cache')
+    if not _cache_logger.isEnabledFor(logging.DEBUG):
+        return
     
-    log_message = f"Cache {operation}: {key}"
+    log_format = ["Cache %s: %s"]
+    log_args = [operation, key]
     
     if hit is not None:
-        log_message += f" - Hit: {hit}"
+        log_format.append("Hit: %s")
+        log_args.append(hit)
     if ttl:
-        log_message += f" - TTL: {ttl}s"
+        log_format.append("TTL: %ss")
+        log_args.append(ttl)
     
-    cache_logger.debug(log_message)
+    _cache_logger.debug(" - ".join(log_format), *log_args)
 
 
 def log_error(error, context=None):
     """Log errors with context"""
-    error_logger = logging.getLogger('error_handler')
+    if not _error_logger.isEnabledFor(logging.ERROR):
+        return
     
-    log_message = f"Error: {str(error)}"
+    # Attach a traceback only when there is one; exc_info=True outside an
+    # except block just logs "NoneType: None"
+    if isinstance(error, BaseException) and error.__traceback__ is not None:
+        exc_info = error
+    else:
+        exc_info = sys.exc_info()[0] is not None
     
     if context:
-        log_message += f" - Context: {context}"
-    
-    error_logger.error(log_message, exc_info=True)
-
-
-# Initialize logging when module is imported
-if __name__ != '__main__':
-    setup_logging()
+        _error_logger.error("Error: %s - Context: %s", error, context, exc_info=exc_info)
+    else:
+        _error_logger.error("Error: %s", error, exc_info=exc_info)